@@ -0,0 +1,45 @@
+"""Never reuse reservation ids in SQLite
+
+Revision ID: f3c9d1a7b5e4
+Revises: e8a1f3c5b9d2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c9d1a7b5e4'
+down_revision = 'e8a1f3c5b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В PostgreSQL id берутся из последовательности и не повторяются;
+    # SQLite без AUTOINCREMENT выдаёт заново id удалённых последними
+    # строк — в том числе перенесённых в reservation_archive.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table(
+        'reservation', recreate='always',
+        table_kwargs={'sqlite_autoincrement': True},
+    ):
+        pass
+    # Счётчик начинается после всех id, уже выданных бронированиям,
+    # включая архивные.
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'reservation'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) "
+        "SELECT 'reservation', coalesce(max(id), 0) FROM ("
+        "SELECT id FROM reservation "
+        "UNION ALL SELECT id FROM reservation_archive)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('reservation', recreate='always'):
+        pass
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'reservation'")
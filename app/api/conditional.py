@@ -0,0 +1,88 @@
+"""
+Условные GET-запросы: заголовки ETag и Last-Modified и ответ 304.
+
+ETag строится из идентификатора процесса и номера версии данных
+(app/core/versions.py), поэтому проверить If-None-Match можно
+до запроса к базе: если версия не изменилась, клиенту отдаётся
+пустой ответ 304, и ни база, ни сериализация не нужны.
+"""
+import math
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(value: str) -> str:
+    """Слабый ETag: ответы равны по смыслу, а не побайтно."""
+    return f'W/"{value}"'
+
+
+def get_if_none_match(request: Request) -> list[str]:
+    """
+    Значения ETag из If-None-Match без кавычек и признака W/
+    (для GET используется слабое сравнение).
+    """
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return []
+    return [
+        tag.strip().removeprefix('W/').strip('"')
+        for tag in header.split(',')
+    ]
+
+
+def is_not_modified(
+        request: Request,
+        etag: str,
+        last_modified: Optional[float] = None,
+) -> bool:
+    """
+    Проверяет условия запроса: If-None-Match по значению etag (без
+    кавычек), а если его нет — If-Modified-Since по last_modified.
+    """
+    tags = get_if_none_match(request)
+    if tags:
+        return '*' in tags or etag in tags
+    since = request.headers.get('if-modified-since')
+    if since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # В заголовке время с точностью до секунды, а изменение могло
+    # случиться в ту же секунду позже отданного ответа: 304 только тогда,
+    # когда секунда изменения целиком не позже since.
+    return math.ceil(last_modified) <= since
+
+
+def get_unexpired_etag(
+        request: Request, prefix: str, now: float
+) -> Optional[str]:
+    """
+    If-None-Match для ответов, которые устаревают со временем и без
+    всякой записи (из расписания переговорки пропадают закончившиеся
+    бронирования). Значение такого ETag — prefix-истечение, где
+    истечение — Unix-время, до которого ответ не меняется. Возвращает
+    совпавшее и ещё не истёкшее значение или None.
+    """
+    for tag in get_if_none_match(request):
+        tag_prefix, _, expires = tag.rpartition('-')
+        if tag_prefix == prefix and expires.isdigit() and int(expires) > now:
+            return tag
+    return None
+
+
+def set_validators(
+        response: Response, etag: str, last_modified: float
+) -> Response:
+    """Добавляет к ответу ETag и Last-Modified."""
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+    return response
+
+
+def not_modified_response(etag: str, last_modified: float) -> Response:
+    """Ответ 304 с теми же валидаторами, что и у полного ответа."""
+    return set_validators(Response(status_code=304), etag, last_modified)
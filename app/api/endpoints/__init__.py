@@ -8,6 +8,7 @@
 """
 # app/api/endpoints/__init__.py
 from .meeting_room import router as meeting_room_router
+from .metrics import router as metrics_router
 from .reservation import router as reservation_router
 # Как и при импорте моделей в файл app/models/__init__.py, здесь уместно
 # применить относительные адреса, а не абсолютные.
@@ -7,19 +7,42 @@
 create_meeting_room() и поэтому сама тоже должна быть асинхронной:
 в ней тоже нужно применить ключевые слова async и await.
 """
-from fastapi import APIRouter, Depends
+from datetime import date, datetime, time, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.conditional import (
+    get_unexpired_etag, is_not_modified, make_etag, not_modified_response,
+    set_validators
+)
+from app.api.projections import (
+    load_room_schedule, rows_response, schema_fields, serialize_meeting_room
+)
+from app.api.streaming import ndjson_response, sse_response
+from app.core.cache import room_reservations_cache
+from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.events import room_events, sse_frame
+from app.core.intervals import find_free_slots
+from app.core.occupancy import get_daily_usage_stats, get_occupancy_stats
+from app.core.versions import ROOMS_KEY, versions
 # Вместо импортов 6 функций импортируйте объект meeting_room_crud.
 from app.crud.meeting_room import meeting_room_crud
 from app.crud.reservation import reservation_crud
+from app.crud.room_daily_usage import room_daily_usage_crud
 from app.schemas.meeting_room import (
-    MeetingRoomCreate, MeetingRoomDB, MeetingRoomUpdate
+    MeetingRoomAvailability, MeetingRoomCreate, MeetingRoomDB,
+    MeetingRoomUpdate, OccupancyStats, RoomUsageStats
+)
+from app.schemas.reservation import RoomReservationDB
+from app.api.validators import (
+    check_meeting_room_exists, check_name_duplicate, check_stats_window,
+    check_time_window
 )
-from app.schemas.reservation import ReservationDB
-from app.api.validators import check_meeting_room_exists, check_name_duplicate
 
 # Добавьте импорт зависимости, определяющей,
 # что текущий пользователь - суперюзер.
@@ -70,15 +93,229 @@ async def create_new_meeting_room(
     dependencies=[Depends(current_superuser)],
 )
 async def get_all_meeting_rooms(
+        request: Request,
+        # id последней переговорки с предыдущей страницы.
+        after_id: Optional[int] = None,
+        limit: Optional[int] = Query(None, ge=1),
+        # Отдать ответ потоком в формате NDJSON.
+        stream: bool = False,
         session: AsyncSession = Depends(get_async_session)
 ):
     """
     Для гет запроса на возврат всех комнат.
     Только для суперюзеров.
+
+    Ответ отдаётся с ETag и Last-Modified версии списка переговорок;
+    пока список не менялся, на условный запрос отдаётся 304 без запроса
+    к базе.
     """
-    # Замените вызов функции на вызов метода.
-    all_rooms = await meeting_room_crud.get_multi(session)
-    return all_rooms
+    version, last_modified = versions.get(ROOMS_KEY)
+    etag = f'{versions.process_id}-{version}'
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(make_etag(etag), last_modified)
+    if stream:
+        return set_validators(
+            ndjson_response(
+                meeting_room_crud.stream_multi(
+                    session, after_id=after_id, limit=limit
+                ),
+                serialize_meeting_room,
+            ),
+            make_etag(etag),
+            last_modified,
+        )
+    # Только столбцы полей схемы, без ORM-объектов: см. app/api/projections.py.
+    fields = schema_fields(MeetingRoomDB)
+    rows = await meeting_room_crud.get_multi_rows(
+        session, fields, after_id=after_id, limit=limit
+    )
+    return set_validators(
+        rows_response(rows, fields, exclude_none=True),
+        make_etag(etag),
+        last_modified,
+    )
+
+
+@router.get(
+    '/availability',
+    response_model=list[MeetingRoomAvailability],
+)
+async def get_rooms_availability(
+        from_time: datetime = Query(..., alias='from'),
+        to_time: datetime = Query(..., alias='to'),
+        # Минимальная длительность свободного промежутка, в минутах.
+        duration: int = Query(..., ge=1),
+        min_capacity: Optional[int] = Query(None, ge=1),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Ищет переговорки со свободными промежутками в окне [from, to].
+
+    Вместо запроса расписания каждой переговорки все занятые интервалы
+    окна читаются одним запросом по диапазону, а свободные промежутки
+    находятся сортировкой и одним проходом по каждой переговорке.
+    Промежуток может начинаться в момент конца одного бронирования
+    и заканчиваться в момент начала другого; границы бронирований
+    включаются, поэтому новое бронирование должно лежать строго
+    внутри такого промежутка.
+    """
+    check_time_window(from_time, to_time)
+    rooms = await meeting_room_crud.get_by_min_capacity(min_capacity, session)
+    if not rooms:
+        return []
+    busy = await reservation_crud.get_busy_intervals(
+        room_ids=[room.id for room in rooms],
+        from_time=from_time,
+        to_time=to_time,
+        session=session,
+    )
+    free_slots = find_free_slots(
+        busy, from_time, to_time, timedelta(minutes=duration)
+    )
+    # У переговорок без бронирований свободно всё окно.
+    whole_window = (
+        [(from_time, to_time)]
+        if to_time - from_time >= timedelta(minutes=duration) else []
+    )
+    availability = []
+    for room in rooms:
+        slots = free_slots.get(room.id, whole_window)
+        if slots:
+            availability.append({
+                'id': room.id,
+                'name': room.name,
+                'capacity': room.capacity,
+                'free_slots': [
+                    {
+                        'from_reserve': start.isoformat(),
+                        'to_reserve': end.isoformat(),
+                    }
+                    for start, end in slots
+                ],
+            })
+    # Ответ собран из простых типов и уже соответствует схеме
+    # MeetingRoomAvailability: отдаём его напрямую, минуя построение
+    # pydantic-моделей для тысяч промежутков.
+    return ORJSONResponse(availability)
+
+
+@router.get(
+    '/stats',
+    response_model=OccupancyStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_occupancy_stats_for_rooms(
+        from_time: datetime = Query(..., alias='from'),
+        to_time: datetime = Query(..., alias='to'),
+        granularity: Literal['day', 'week'] = 'day',
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Загрузка переговорок в окне [from, to): забронированные часы и их
+    доля по дням или неделям и тепловая карта по дням недели и часам.
+    Только для суперюзеров.
+
+    Бронирования окна читаются одним запросом по трём столбцам, время
+    приходит из базы уже числом секунд, а агрегаты считаются
+    префиксными суммами (см. app/core/occupancy.py).
+    """
+    check_stats_window(from_time, to_time)
+    rooms = await meeting_room_crud.get_multi_rows(session, ('id', 'name'))
+    intervals = await reservation_crud.get_epoch_intervals(
+        room_ids=[room_id for room_id, _ in rooms],
+        from_time=from_time,
+        to_time=to_time,
+        session=session,
+    )
+    return ORJSONResponse(get_occupancy_stats(
+        rooms, intervals, from_time, to_time, granularity
+    ))
+
+
+@router.get(
+    '/daily_usage',
+    response_model=RoomUsageStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_daily_usage(
+        from_day: date = Query(..., alias='from'),
+        to_day: date = Query(..., alias='to'),
+        granularity: Literal['day', 'week'] = 'day',
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Загрузка переговорок по дням или неделям за дни [from, to)
+    из суточной свёртки room_daily_usage — без чтения бронирований.
+    Только для суперюзеров.
+
+    Вхождения повторяющихся серий входят в свёртку так же, как обычные
+    бронирования, поэтому по дням отчёт совпадает с /meeting_rooms/stats;
+    для загрузки по часам нужен /meeting_rooms/stats.
+    """
+    check_stats_window(
+        datetime.combine(from_day, time()), datetime.combine(to_day, time())
+    )
+    rooms = await meeting_room_crud.get_multi_rows(session, ('id', 'name'))
+    rows = await room_daily_usage_crud.get_in_window(from_day, to_day, session)
+    return ORJSONResponse(get_daily_usage_stats(
+        rooms, rows, from_day, to_day, granularity
+    ))
+
+
+@router.get('/events')
+async def subscribe_to_room_events(
+        room_ids: list[int] = Query(..., alias='room_id'),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Изменения расписаний переговорок в формате Server-Sent Events,
+    вместо опроса /meeting_rooms/{id}/reservations. Переговорки
+    передаются параметрами: ?room_id=1&room_id=2.
+
+    Первым для каждой переговорки приходит событие snapshot
+    с её текущим расписанием, затем — created, updated и deleted
+    для бронирований и series_changed для серий (расписание нужно
+    перечитать). Клиент, который не успевает читать события, получает
+    overflow и отключается; после переподключения он снова получит
+    snapshot.
+    """
+    room_ids = sorted(set(room_ids))
+    for room_id in room_ids:
+        await check_meeting_room_exists(room_id, session)
+    # Подписываемся до чтения расписаний: изменение, записанное
+    # во время чтения, придёт событием, а не потеряется.
+    subscription = room_events.subscribe(room_ids)
+    try:
+        frames = [
+            sse_frame('snapshot', {
+                'meetingroom_id': room_id,
+                'reservations': [
+                    item for _, item in await load_room_schedule(
+                        room_id, session
+                    )
+                ],
+            })
+            for room_id in room_ids
+        ]
+    except BaseException:
+        room_events.unsubscribe(subscription)
+        raise
+    # Сессия больше не нужна: соединение возвращается в пул сейчас,
+    # а не когда клиент отключится.
+    await session.close()
+    return sse_response(subscription, frames)
+
+
+@router.get(
+    '/cache_stats',
+    dependencies=[Depends(current_superuser)],
+)
+async def get_cache_stats():
+    """
+    Счётчики кэша бронирований переговорок: попадания, промахи и размер.
+    Только для суперюзеров.
+    """
+    return room_reservations_cache.stats()
 
 
 @router.patch(
@@ -137,12 +374,15 @@ async def remove_meeting_room(
 
 @router.get(
     '/{meeting_room_id}/reservations',
-    response_model=list[ReservationDB],
+    response_model=list[RoomReservationDB],
     # Добавляем множество с полями, которые надо исключить из ответа.
     response_model_exclude={'user_id'},
 )
 async def get_reservations_for_room(
         meeting_room_id: int,
+        request: Request,
+        # Конец окна, в котором разворачиваются повторяющиеся серии.
+        until: Optional[datetime] = None,
         session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -153,9 +393,45 @@ async def get_reservations_for_room(
     и передавать id переговорки через path-параметр или тело запроса.
     Но такой запрос выбивался бы из существующей структуры API,
     поэтому мы сделали именно так, как сделали.
+
+    Без параметра until ответ читается через кэш: для каждой переговорки
+    хранится готовый к отправке список ближайших бронирований, который
+    сбрасывается при любом изменении бронирований этой переговорки.
+    Уже закончившиеся бронирования отфильтровываются при чтении.
+
+    Такой ответ отдаётся с ETag из версии расписания переговорки
+    и момента, когда закончится первое из бронирований. Пока версия
+    не изменилась и этот момент не наступил, на If-None-Match
+    с тем же ETag отдаётся 304 — без кэша, базы и сериализации.
     """
-    await check_meeting_room_exists(meeting_room_id, session)
-    reservations = reservation_crud.get_future_reservations_for_room(
-        room_id=meeting_room_id, session=session
+    if until is not None:
+        await check_meeting_room_exists(meeting_room_id, session)
+        items = await load_room_schedule(meeting_room_id, session, until)
+        return ORJSONResponse([item for _, item in items])
+    # Версию читаем до запроса к базе: если расписание изменится во время
+    # запроса, ответ получит прежнюю версию и следующий запрос получит 200.
+    version, last_modified = versions.get(meeting_room_id)
+    etag_prefix = f'{versions.process_id}-{version}'
+    now = datetime.now()
+    etag = get_unexpired_etag(request, etag_prefix, now.timestamp())
+    if etag is not None:
+        return not_modified_response(make_etag(etag), last_modified)
+    items = room_reservations_cache.get(meeting_room_id)
+    if items is None:
+        await check_meeting_room_exists(meeting_room_id, session)
+        items = await load_room_schedule(meeting_room_id, session)
+        room_reservations_cache.set(meeting_room_id, items)
+    items = [
+        (to_reserve, item) for to_reserve, item in items if to_reserve > now
+    ]
+    # Окно повторяющихся серий сдвигается со временем, поэтому ответ
+    # считается неизменным не дольше времени жизни записи кэша.
+    expires = min([
+        now.timestamp() + settings.room_reservations_cache_ttl,
+        *(to_reserve.timestamp() for to_reserve, _ in items),
+    ])
+    return set_validators(
+        ORJSONResponse([item for _, item in items]),
+        make_etag(f'{etag_prefix}-{int(expires)}'),
+        last_modified,
     )
-    return reservations
@@ -0,0 +1,15 @@
+"""Эндпоинт для сбора метрик сервером Prometheus."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики процесса в текстовом формате Prometheus."""
+    return PlainTextResponse(
+        metrics.render(), media_type='text/plain; version=0.0.4'
+    )
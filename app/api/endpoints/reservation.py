@@ -3,7 +3,10 @@
 для модели Reservation.
 Здесь создаем обработку запросов на резервирование перегородок.
 """
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Дополнительно импортируем новый валидатор:
@@ -11,14 +14,28 @@ from app.api.validators import (
     check_meeting_room_exists,
     check_reservation_before_edit,
     check_reservation_intersections,
+    check_reservations_bulk,
+    check_series_before_edit,
+    check_series_intersections,
+)
+from app.api.projections import (
+    rows_response, schema_fields, serialize_reservation
 )
+from app.api.streaming import ndjson_response
 from app.core.db import get_async_session
+from app.core.room_locks import room_locks
 from app.core.user import current_superuser, current_user
 from app.crud.reservation import reservation_crud
+from app.crud.reservation_series import reservation_series_crud
 from app.models import User
-from app.schemas.reservation import (ReservationCreate, ReservationDB,
+from app.schemas.reservation import (ReservationBulkResult,
+                                     ReservationCreate, ReservationDB,
                                      ReservationUpdate
                                      )
+from app.schemas.reservation_series import (ReservationSeriesCreate,
+                                            ReservationSeriesDB,
+                                            ReservationSeriesUpdate
+                                            )
 
 
 router = APIRouter()
@@ -47,21 +64,71 @@ async def create_reservation(
     """
     # Проверка, что указанная в запросе переговорка вообще существует
     await check_meeting_room_exists(reservation.meetingroom_id, session)
-    # Проверка, что запрошенный интервал не пересекается по времени с ранее
-    # созданными объектами Reservation — здесь аргументы нужно передавать
-    # с указанием ключей, так как валидатор принимает kwargs.
-    await check_reservation_intersections(
-        # Так как валидатор принимает **kwargs,
-        # аргументы должны быть переданы с указанием ключей.
-        **reservation.dict(), session=session
-    )
-    new_reservation = await reservation_crud.create(
-        # Передаём объект пользователя в метод создания объекта бронирования.
-        reservation, session, user
-    )
+    # Проверка пересечений и запись выполняются под блокировкой
+    # переговорки, иначе два одновременных запроса могут пройти
+    # проверку до того, как любой из них сохранит бронирование.
+    async with room_locks.hold([reservation.meetingroom_id], session):
+        # Проверка, что запрошенный интервал не пересекается по времени
+        # с ранее созданными объектами Reservation — здесь аргументы нужно
+        # передавать с указанием ключей, так как валидатор принимает kwargs.
+        await check_reservation_intersections(
+            # Так как валидатор принимает **kwargs,
+            # аргументы должны быть переданы с указанием ключей.
+            **reservation.dict(), session=session
+        )
+        new_reservation = await reservation_crud.create(
+            # Передаём объект пользователя в метод создания
+            # объекта бронирования.
+            reservation, session, user
+        )
     return new_reservation
 
 
+@router.post(
+    '/bulk',
+    response_model=list[ReservationBulkResult],
+    response_model_exclude_none=True,
+)
+async def create_reservations_bulk(
+    reservations: list[ReservationCreate] = Body(
+        ..., min_items=1, max_items=1000
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """
+    Создаёт пачку бронирований, например для повторяющихся встреч.
+
+    Все элементы проверяются вместе — по базе и друг с другом, —
+    свободные сохраняются одним запросом и одним commit().
+    В ответе для каждого элемента указан результат.
+    """
+    room_ids = [reservation.meetingroom_id for reservation in reservations]
+    async with room_locks.hold(room_ids, session):
+        errors = await check_reservations_bulk(reservations, session)
+        accepted = [
+            reservation
+            for reservation, error in zip(reservations, errors)
+            if error is None
+        ]
+        created = iter(
+            await reservation_crud.create_multi(accepted, session, user)
+            if accepted else []
+        )
+    results = []
+    for index, error in enumerate(errors):
+        if error is None:
+            results.append(ReservationBulkResult(
+                index=index, status='created', reservation=next(created)
+            ))
+        else:
+            status, detail = error
+            results.append(ReservationBulkResult(
+                index=index, status=status, detail=detail
+            ))
+    return results
+
+
 @router.get(
     '/',
     response_model=list[ReservationDB],
@@ -69,15 +136,35 @@ async def create_reservation(
 
 )
 async def get_all_reservations(
+    # id последнего бронирования с предыдущей страницы.
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    # Временное окно: бронирования, пересекающиеся с ним.
+    from_time: Optional[datetime] = None,
+    to_time: Optional[datetime] = None,
+    # Отдать ответ потоком в формате NDJSON.
+    stream: bool = False,
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Возвращает список бронирования.
     Только для суперюзеров.
 
+    Поддерживает пагинацию по ключу (after_id, limit), фильтр по
+    временному окну и потоковую отдачу для больших выборок.
     """
-    reservations = await reservation_crud.get_multi(session)
-    return reservations
+    filters = dict(
+        after_id=after_id, limit=limit, from_time=from_time, to_time=to_time
+    )
+    if stream:
+        return ndjson_response(
+            reservation_crud.stream_multi(session, **filters),
+            serialize_reservation,
+        )
+    # Только столбцы полей схемы, без ORM-объектов: см. app/api/projections.py.
+    fields = schema_fields(ReservationDB)
+    rows = await reservation_crud.get_multi_rows(session, fields, **filters)
+    return rows_response(rows, fields)
 
 
 @router.delete(
@@ -112,23 +199,24 @@ async def update_reservation(
     # Проверяем, что такой объект бронирования вообще существует.
     reservation = await check_reservation_before_edit(reservation_id,
                                                       session, user,)
-    # Проверяем, что нет пересечений с другими бронированиями.
-    await check_reservation_intersections(
-        # Новое время бронирования, распакованное на ключевые аргументы.
-        **obj_in.dict(),
-        # id обновляемого объекта бронирования,
-        reservation_id=reservation_id,
-        # id переговорки.
-        meetingroom_id=reservation.meetingroom_id,
-        session=session
-    )
-    reservation = await reservation_crud.update(
-        db_obj=reservation,
-        # На обновление передаем объект класса ReservationUpdate,
-        # как и требуется.
-        obj_in=obj_in,
-        session=session,
-    )
+    async with room_locks.hold([reservation.meetingroom_id], session):
+        # Проверяем, что нет пересечений с другими бронированиями.
+        await check_reservation_intersections(
+            # Новое время бронирования, распакованное на ключевые аргументы.
+            **obj_in.dict(),
+            # id обновляемого объекта бронирования,
+            reservation_id=reservation_id,
+            # id переговорки.
+            meetingroom_id=reservation.meetingroom_id,
+            session=session
+        )
+        reservation = await reservation_crud.update(
+            db_obj=reservation,
+            # На обновление передаем объект класса ReservationUpdate,
+            # как и требуется.
+            obj_in=obj_in,
+            session=session,
+        )
     return reservation
 
 
@@ -139,15 +227,94 @@ async def update_reservation(
     response_model_exclude={'user_id'},
 )
 async def get_my_reservations(
+        include_archived: bool = False,
         session: AsyncSession = Depends(get_async_session),
         # В этой зависимости получаем обычного пользователя, а не суперюзера.
         user: User = Depends(current_user)
 ):
     # Сразу можно добавить докстринг для большей информативности.
-    """Получает список всех бронирований для текущего пользователя."""
-    # Вызываем созданный метод.
-    reservations = await reservation_crud.get_by_user(
+    """
+    Получает список всех бронирований для текущего пользователя.
+
+    Прошедшие бронирования со временем переносятся в архив;
+    с include_archived=true они тоже попадают в список.
+    """
+    # Выбираем только поля схемы без user_id и отдаём их напрямую.
+    fields = schema_fields(ReservationDB, exclude={'user_id'})
+    rows = await reservation_crud.get_rows_by_user(
         user=user,
-        session=session
+        fields=fields,
+        session=session,
+        include_archived=include_archived,
+    )
+    return rows_response(rows, fields)
+
+
+@router.post(
+    '/series',
+    response_model=ReservationSeriesDB,
+)
+async def create_reservation_series(
+    series: ReservationSeriesCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """
+    Создаёт серию повторяющихся бронирований одной записью.
+
+    Каждое вхождение серии проверяется на пересечения с бронированиями
+    и с другими сериями переговорки.
+    """
+    await check_meeting_room_exists(series.meetingroom_id, session)
+    async with room_locks.hold([series.meetingroom_id], session):
+        await check_series_intersections(series, session)
+        return await reservation_series_crud.create(series, session, user)
+
+
+@router.get(
+    '/series/my',
+    response_model=list[ReservationSeriesDB],
+    response_model_exclude={'user_id'},
+)
+async def get_my_reservation_series(
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Получает список серий бронирований текущего пользователя."""
+    return await reservation_series_crud.get_by_user(
+        user=user, session=session
     )
-    return reservations
+
+
+@router.patch(
+    '/series/{series_id}',
+    response_model=ReservationSeriesDB,
+)
+async def update_reservation_series(
+    series_id: int,
+    obj_in: ReservationSeriesUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """
+    Обновляет список отменённых вхождений серии.
+
+    Отмена вхождений только освобождает время,
+    поэтому проверка пересечений не нужна.
+    """
+    series = await check_series_before_edit(series_id, session, user)
+    return await reservation_series_crud.update(series, obj_in, session)
+
+
+@router.delete(
+    '/series/{series_id}',
+    response_model=ReservationSeriesDB,
+)
+async def delete_reservation_series(
+    series_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Удаляем серию вместе со всеми её вхождениями."""
+    series = await check_series_before_edit(series_id, session, user)
+    return await reservation_series_crud.remove(series, session)
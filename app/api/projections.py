@@ -0,0 +1,119 @@
+"""
+Быстрая отдача списков без ORM-объектов и pydantic-моделей.
+
+Обычный путь списка: загрузить ORM-объекты, для каждого построить
+модель схемы через orm_mode, затем превратить её в JSON. На больших
+списках почти всё время уходит на построение объектов, а не на базу.
+
+Здесь из базы выбираются только столбцы, совпадающие с полями схемы
+ответа, строки-кортежи превращаются в словари и сразу сериализуются
+через orjson (он умеет datetime и пишет его в том же формате ISO 8601).
+Схема по-прежнему указывается в response_model декоратора, поэтому
+документация OpenAPI не меняется.
+
+Там, где ORM-объекты всё же загружаются (потоковая отдача, расписание
+переговорки), вместо from_orm() используются заранее собранные
+сериализаторы: они читают атрибуты полей схемы без валидации.
+"""
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.reservation import reservation_crud
+from app.schemas.meeting_room import MeetingRoomDB
+from app.schemas.reservation import ReservationDB, RoomReservationDB
+
+
+def schema_fields(
+        schema: type[BaseModel], exclude: Iterable[str] = ()
+) -> list[str]:
+    """Поля схемы в порядке объявления — в том же порядке, что и в JSON."""
+    exclude = set(exclude)
+    return [name for name in schema.__fields__ if name not in exclude]
+
+
+def compile_serializer(
+        schema: type[BaseModel],
+        exclude: Iterable[str] = (),
+        exclude_none: bool = False,
+) -> Callable[[Any], dict]:
+    """
+    Функция, превращающая ORM-объект (или любой объект с атрибутами
+    полей схемы) в словарь для orjson.
+
+    Поля и их значения по умолчанию вычисляются один раз, при создании
+    сериализатора. Как и from_orm(), отсутствующий у объекта атрибут
+    заменяется значением по умолчанию поля (у Reservation, например,
+    нет series_id). datetime остаётся как есть — его сериализует orjson.
+    exclude и exclude_none повторяют response_model_exclude*.
+    """
+    fields = [
+        (name, schema.__fields__[name].default)
+        for name in schema_fields(schema, exclude)
+    ]
+    if exclude_none:
+        def serialize(obj) -> dict:
+            values = {
+                name: getattr(obj, name, default) for name, default in fields
+            }
+            return {
+                name: value for name, value in values.items()
+                if value is not None
+            }
+    else:
+        def serialize(obj) -> dict:
+            return {
+                name: getattr(obj, name, default) for name, default in fields
+            }
+    return serialize
+
+
+serialize_reservation = compile_serializer(ReservationDB)
+serialize_room_reservation = compile_serializer(
+    RoomReservationDB, exclude={'user_id'}
+)
+serialize_meeting_room = compile_serializer(MeetingRoomDB, exclude_none=True)
+
+
+async def load_room_schedule(
+        room_id: int,
+        session: AsyncSession,
+        until: Optional[datetime] = None,
+) -> list[tuple[datetime, dict]]:
+    """
+    Ближайшие бронирования переговорки в том виде, в каком их хранит
+    кэш расписаний: пары (конец бронирования, словарь ответа).
+    """
+    reservations = await reservation_crud.get_future_reservations_for_room(
+        room_id=room_id, session=session, until=until
+    )
+    return [
+        (reservation.to_reserve, serialize_room_reservation(reservation))
+        for reservation in reservations
+    ]
+
+
+def rows_response(
+        rows: Iterable[Sequence],
+        fields: Sequence[str],
+        exclude_none: bool = False,
+) -> ORJSONResponse:
+    """
+    JSON-ответ со списком объектов из строк, выбранных по полям fields.
+
+    exclude_none повторяет response_model_exclude_none=True.
+    """
+    if exclude_none:
+        items = [
+            {
+                name: value
+                for name, value in zip(fields, row) if value is not None
+            }
+            for row in rows
+        ]
+    else:
+        items = [dict(zip(fields, row)) for row in rows]
+    return ORJSONResponse(items)
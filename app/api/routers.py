@@ -11,7 +11,10 @@
 from fastapi import APIRouter
 
 # Две длинных строчки импортов заменяем на одну короткую.
-from app.api.endpoints import meeting_room_router, reservation_router, user_router
+from app.api.endpoints import (
+    meeting_room_router, metrics_router, reservation_router, user_router
+)
+from app.core.config import settings
 
 
 main_router = APIRouter()
@@ -25,6 +28,9 @@ main_router.include_router(
 # app/api/endpoints/user.py, так что в файле app/api/routers.py будет
 # только подключение, и никаких дополнительных параметров.
 main_router.include_router(user_router)
+# Эндпоинт /metrics подключается, только если сбор метрик включён.
+if settings.metrics_enabled:
+    main_router.include_router(metrics_router, tags=['Metrics'])
 
 # Из файла app/api/routers.py можно управлять тегами и префиксами роутеров:
 # их можно указывать не только в объекте APIRouter,
@@ -0,0 +1,72 @@
+"""
+Потоковая отдача списков в формате NDJSON и событий в формате
+Server-Sent Events.
+
+Каждая строка NDJSON — отдельный JSON-объект; строки формируются
+по мере чтения порций из базы, так что ответ любого размера не
+собирается в памяти целиком.
+"""
+from typing import Any, AsyncIterator, Callable, Iterable
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import OVERFLOW_FRAME, Subscription, room_events
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+SSE_MEDIA_TYPE = 'text/event-stream'
+# Кадр-комментарий, который клиенты SSE пропускают.
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+
+def ndjson_response(
+        partitions: AsyncIterator[Iterable],
+        serialize: Callable[[Any], dict],
+) -> StreamingResponse:
+    """
+    Оборачивает порции ORM-объектов в потоковый ответ.
+
+    serialize — сериализатор схемы ответа из app/api/projections.py,
+    уже учитывающий exclude и exclude_none.
+    """
+    async def lines():
+        async for partition in partitions:
+            yield b''.join(
+                orjson.dumps(serialize(obj)) + b'\n' for obj in partition
+            )
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def sse_response(
+        subscription: Subscription,
+        frames: Iterable[bytes] = (),
+) -> StreamingResponse:
+    """
+    Поток событий подписки: сначала кадры frames, затем события
+    из очереди подписчика, пока клиент не отключится.
+
+    Если событий долго нет, отправляется кадр-комментарий: прокси
+    не закрывают соединение, а отключившийся клиент обнаруживается.
+    """
+    async def events():
+        try:
+            for frame in frames:
+                yield frame
+            while True:
+                frame = await subscription.get(settings.room_events_keepalive)
+                if frame is None:
+                    if subscription.overflowed:
+                        yield OVERFLOW_FRAME
+                    return
+                yield frame or KEEPALIVE_FRAME
+        finally:
+            room_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        # Буферизация nginx задержала бы события.
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
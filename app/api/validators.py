@@ -1,14 +1,25 @@
+from datetime import datetime, timedelta
+from typing import Optional
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.intervals import find_batch_conflicts
+from app.core.metrics import timed_validator
+from app.core.occupancy import MAX_WINDOW_DAYS
+from app.core.recurrence import get_last_end, get_step, iter_occurrences
 from app.crud.meeting_room import meeting_room_crud
 from app.crud.reservation import reservation_crud
+from app.crud.reservation_series import reservation_series_crud
 # Так как в Python-пакете app.models модели импортированы в __init__.py,
 # импортировать их можно прямо из пакета.
-from app.models import MeetingRoom, Reservation, User
+from app.models import MeetingRoom, Reservation, ReservationSeries, User
+from app.schemas.reservation import ReservationCreate
+from app.schemas.reservation_series import ReservationSeriesCreate
 
 
+@timed_validator
 async def check_name_duplicate(
         # Корутина, проверяющая уникальность полученного имени переговорки.
         room_name: str,
@@ -24,6 +35,7 @@ async def check_name_duplicate(
         )
 
 
+@timed_validator
 async def check_meeting_room_exists(
     # Оформляем повторяющийся код в виде отдельной корутины.
     meeting_room_id: int,
@@ -41,6 +53,41 @@ async def check_meeting_room_exists(
     return meeting_room
 
 
+@timed_validator
+def check_time_window(from_time: datetime, to_time: datetime) -> None:
+    """
+    Окно поиска задаётся без часового пояса, как и время бронирований,
+    и его начало должно быть раньше конца.
+    """
+    if from_time.tzinfo is not None or to_time.tzinfo is not None:
+        raise HTTPException(
+            status_code=422,
+            detail='Время окна указывается без часового пояса',
+        )
+    if from_time >= to_time:
+        raise HTTPException(
+            status_code=422,
+            detail='Начало окна не может быть позже его окончания',
+        )
+
+
+@timed_validator
+def check_stats_window(from_time: datetime, to_time: datetime) -> None:
+    """
+    Окно статистики загрузки не длиннее MAX_WINDOW_DAYS дней.
+    Время с часовым поясом отклоняется в check_time_window(): to_epoch()
+    считает секунды только от наивного EPOCH.
+    """
+    check_time_window(from_time, to_time)
+    if to_time - from_time > timedelta(days=MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=422,
+            detail=f'Окно статистики не может быть длиннее '
+                   f'{MAX_WINDOW_DAYS} дней',
+        )
+
+
+@timed_validator
 async def check_reservation_intersections(**kwargs) -> None:
     """
     Этот валидатор должен:
@@ -53,7 +100,34 @@ async def check_reservation_intersections(**kwargs) -> None:
     HTTPException со статусом 422 и в сообщении об ошибке возвращать
     полученный список объектов;
     если список reservations пустой — ничего возвращать не надо.
+
+    Сначала выполняется дешёвая проверка через EXISTS: в большинстве
+    запросов пересечений нет, и список объектов загружать не нужно.
+
+    В режиме reservation_conflict_detail='summary' вместо списка
+    объектов возвращается их число и первые несколько интервалов.
     """
+    if not await reservation_crud.has_reservations_at_the_same_time(
+        **kwargs
+    ):
+        return
+    if settings.reservation_conflict_detail == 'summary':
+        count, intervals = await reservation_crud.get_conflicts_summary(
+            limit=settings.reservation_conflict_limit, **kwargs
+        )
+        if count:
+            raise HTTPException(status_code=422, detail={
+                'message': 'Это время уже забронировано',
+                'count': count,
+                'conflicts': [
+                    {
+                        'from_reserve': from_reserve.isoformat(),
+                        'to_reserve': to_reserve.isoformat(),
+                    }
+                    for from_reserve, to_reserve in intervals
+                ],
+            })
+        return
     reservations = await reservation_crud.get_reservations_at_the_same_time(
         **kwargs
     )
@@ -61,6 +135,131 @@ async def check_reservation_intersections(**kwargs) -> None:
         raise HTTPException(status_code=422, detail=str(reservations))
 
 
+@timed_validator
+async def check_reservations_bulk(
+        reservations: list[ReservationCreate],
+        session: AsyncSession,
+) -> list[Optional[tuple[str, str]]]:
+    """
+    Проверяет пачку бронирований двумя запросами вместо 2N.
+
+    Первый запрос находит существующие переговорки, второй — все
+    бронирования этих переговорок в общем временном окне пачки.
+    Пересечения с ними и между элементами пачки ищутся сортировкой
+    и одним проходом. Для каждого элемента возвращает None, если его
+    можно создать, или пару (статус, причина).
+    """
+    room_ids = await meeting_room_crud.get_existing_ids(
+        {reservation.meetingroom_id for reservation in reservations}, session
+    )
+    errors: list[Optional[tuple[str, str]]] = [None] * len(reservations)
+    candidates = []
+    for index, reservation in enumerate(reservations):
+        if reservation.meetingroom_id in room_ids:
+            candidates.append(index)
+        else:
+            errors[index] = ('room_not_found', 'Переговорка не найдена!')
+    if not candidates:
+        return errors
+    items = [
+        (
+            reservations[index].meetingroom_id,
+            reservations[index].from_reserve,
+            reservations[index].to_reserve,
+        )
+        for index in candidates
+    ]
+    existing = await reservation_crud.get_busy_intervals(
+        room_ids={room_id for room_id, _, _ in items},
+        from_time=min(from_reserve for _, from_reserve, _ in items),
+        to_time=max(to_reserve for _, _, to_reserve in items),
+        session=session,
+    )
+    for index, conflict in zip(
+        candidates, find_batch_conflicts(items, existing)
+    ):
+        if conflict is None:
+            continue
+        kind, value = conflict
+        if kind == 'existing':
+            detail = f'Уже забронировано с {value[0]} по {value[1]}'
+        else:
+            detail = (
+                f'Пересекается с элементом {candidates[value]} этого запроса'
+            )
+        errors[index] = ('conflict', detail)
+    return errors
+
+
+@timed_validator
+async def check_series_intersections(
+        series: ReservationSeriesCreate,
+        session: AsyncSession,
+) -> None:
+    """
+    Проверяет все вхождения новой серии на пересечения с бронированиями
+    и вхождениями других серий той же переговорки.
+
+    Вхождения серии ограничены по количеству, поэтому проверка сводится
+    к одному запросу по окну серии и проходу find_batch_conflicts().
+    """
+    step = get_step(series.frequency, series.interval)
+    ends_at = get_last_end(
+        series.from_reserve, series.to_reserve, step,
+        series.count, series.until,
+    )
+    items = [
+        (series.meetingroom_id, from_reserve, to_reserve)
+        for from_reserve, to_reserve in iter_occurrences(
+            from_reserve=series.from_reserve,
+            to_reserve=series.to_reserve,
+            step=step,
+            count=series.count,
+            until=series.until,
+            exceptions=set(series.exceptions),
+            window_from=series.from_reserve,
+            window_to=ends_at,
+        )
+    ]
+    existing = await reservation_crud.get_busy_intervals(
+        room_ids={series.meetingroom_id},
+        from_time=series.from_reserve,
+        to_time=ends_at,
+        session=session,
+    )
+    conflicts = {
+        conflict[1]
+        for conflict in find_batch_conflicts(items, existing)
+        if conflict is not None
+    }
+    if conflicts:
+        raise HTTPException(status_code=422, detail=str([
+            f'Уже забронировано с {from_reserve} по {to_reserve}'
+            for from_reserve, to_reserve in sorted(conflicts)
+        ]))
+
+
+@timed_validator
+async def check_series_before_edit(
+        series_id: int,
+        session: AsyncSession,
+        user: User,
+) -> ReservationSeries:
+    """Серию может менять или удалять только её автор или суперюзер."""
+    series = await reservation_series_crud.get(
+        obj_id=series_id, session=session
+    )
+    if not series:
+        raise HTTPException(status_code=404, detail='Серия не найдена!')
+    if series.user_id != user.id and not user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail='Невозможно редактировать или удалить чужую серию!'
+        )
+    return series
+
+
+@timed_validator
 async def check_reservation_before_edit(
         reservation_id: int,
         session: AsyncSession,
@@ -0,0 +1,50 @@
+"""
+Перенос прошедших бронирований в архив.
+
+Бронирования, закончившиеся больше retention-days дней назад, переезжают
+из таблицы reservation в reservation_archive. Рабочая таблица и её
+индексы остаются маленькими, поэтому проверка пересечений, расписание
+переговорки и списки не замедляются с ростом истории, а сама история
+по-прежнему доступна: в /reservations/my_reservations?include_archived=true,
+в статистике загрузки и в пересчёте суточной свёртки.
+
+Запуск из корня проекта:
+    python -m app.core.archive
+    python -m app.core.archive --retention-days 30
+
+Перенос идёт короткими порциями, поэтому его можно запускать
+без остановки приложения.
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.init_db import get_async_session_context
+from app.crud.reservation import reservation_crud
+
+
+async def archive_reservations(retention_days: int) -> int:
+    async with get_async_session_context() as session:
+        return await reservation_crud.archive_finished(
+            before=datetime.now() - timedelta(days=retention_days),
+            session=session,
+            batch_size=settings.reservation_archive_batch_size,
+        )
+
+
+async def main(retention_days: int) -> None:
+    archived = await archive_reservations(retention_days)
+    # Соединения пула закрываем явно, иначе процесс не завершится.
+    await engine.dispose()
+    print(f'reservation_archive: {archived} reservations archived')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--retention-days', type=int,
+        default=settings.reservation_retention_days,
+    )
+    asyncio.run(main(parser.parse_args().retention_days))
@@ -0,0 +1,36 @@
+"""
+Пересчёт суточной свёртки загрузки переговорок по всем бронированиям
+и вхождениям серий.
+
+Нужен один раз после миграции, добавившей таблицу room_daily_usage,
+один раз после обновления, с которого в свёртку входят серии,
+и в любой момент, если свёртка разошлась с бронированиями (например,
+их меняли в базе вручную). Запуск из корня проекта:
+    python -m app.core.backfill
+
+Пересчёт заменяет свёртку в одной транзакции и на это время блокирует
+запись в неё (см. CRUDRoomDailyUsage.backfill), поэтому его можно
+запускать, не останавливая приложение: в SQLite запись бронирований
+будет ждать конца пересчёта.
+"""
+import asyncio
+
+from app.core.db import engine
+from app.core.init_db import get_async_session_context
+from app.crud.room_daily_usage import room_daily_usage_crud
+
+
+async def backfill_room_daily_usage() -> int:
+    async with get_async_session_context() as session:
+        return await room_daily_usage_crud.backfill(session)
+
+
+async def main() -> None:
+    rows = await backfill_room_daily_usage()
+    # Соединения пула закрываем явно, иначе процесс не завершится.
+    await engine.dispose()
+    print(f'room_daily_usage: {rows} rows')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -10,4 +10,7 @@
 # перепишем здесь импорты моделей в одну строку:
 """Импорты класса Base и всех моделей для Alembic."""
 from app.core.db import Base  # noqa
-from app.models import MeetingRoom, Reservation, User  # noqa
+from app.models import (  # noqa
+    JobLease, MeetingRoom, Reservation, ReservationArchive,
+    ReservationSeries, RoomDailyUsage, User
+)
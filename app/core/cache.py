@@ -0,0 +1,95 @@
+"""
+Кэши в памяти процесса.
+
+TTLCache — словарь с ограниченным числом записей (вытесняются давно
+не использованные) и временем жизни каждой записи. Счётчики попаданий
+и промахов позволяют понять, насколько кэш полезен.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """LRU-кэш с ограниченным размером и временем жизни записей."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Значения хранятся вместе с моментом, когда они устаревают.
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Удаляет записи, значения которых удовлетворяют условию."""
+        for key in [
+            key for key, (_, value) in self._data.items() if predicate(value)
+        ]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def purge_expired(self) -> int:
+        """
+        Удаляет устаревшие записи и возвращает их число.
+
+        get() удаляет устаревшую запись только при обращении к ней,
+        поэтому записи, к которым больше не обращаются (например,
+        истёкшие токены), иначе занимали бы память до вытеснения.
+        """
+        now = time.monotonic()
+        expired = [
+            key for key, (expires, _) in self._data.items() if expires <= now
+        ]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+# Ближайшие бронирования переговорок: ключ — id переговорки.
+room_reservations_cache = TTLCache(
+    maxsize=settings.room_reservations_cache_size,
+    ttl=settings.room_reservations_cache_ttl,
+)
+# Проверенные JWT: ключ — хеш токена, значение — столбцы пользователя.
+user_token_cache = TTLCache(
+    maxsize=settings.user_token_cache_size,
+    ttl=settings.user_token_cache_ttl,
+)
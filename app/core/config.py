@@ -4,7 +4,7 @@
 Будет хранить файлы, отвечающие за «ядро» проекта — общие настройки приложения,
 файлы для работы с БД и другие файлы, отвечающие за конфигурацию проекта.
 """
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseSettings, EmailStr
 
@@ -26,6 +26,108 @@ class Settings(BaseSettings):
     # в системе.
     first_superuser_email: Optional[EmailStr] = None
     first_superuser_password: Optional[str] = None
+    # Индекс бронирований в памяти процесса:
+    # off — не используется, on — отвечает вместо SQL-запроса,
+    # verify — сверяет свой ответ с SQL-запросом и пишет расхождения в лог.
+    # Индекс знает только обычные бронирования: вхождения повторяющихся
+    # серий всегда читаются из базы, поэтому в режиме on проверка без
+    # пересечений с бронированиями всё равно делает запрос к серии.
+    reservation_index_mode: Literal['off', 'on', 'verify'] = 'off'
+    # На сколько дней вперёд разворачивать повторяющиеся серии
+    # в расписании переговорки, если конец окна не указан.
+    recurrence_window_days: int = 28
+    # Ответ 422 при пересечении бронирований: full — все пересекающиеся
+    # бронирования строкой, summary — JSON с их числом и первыми
+    # reservation_conflict_limit интервалами, без загрузки объектов.
+    reservation_conflict_detail: Literal['full', 'summary'] = 'full'
+    reservation_conflict_limit: int = 5
+    # Архив бронирований: закончившиеся больше
+    # reservation_retention_days дней назад переносятся в таблицу
+    # reservation_archive порциями по reservation_archive_batch_size.
+    reservation_retention_days: int = 90
+    reservation_archive_batch_size: int = 5000
+    # Планировщик фоновых задач. Расписания задач — в формате cron
+    # или интервалом в секундах; None выключает задачу. jitter —
+    # наибольшая случайная задержка запуска в секундах.
+    # archive — перенос прошедших бронирований в архив,
+    # rollup — полный пересчёт суточной свёртки загрузки; по умолчанию
+    # выключен: свёртка обновляется приращениями при каждой записи,
+    # а пересчёт на всё время работы блокирует запись бронирований
+    # (см. python -m app.core.backfill),
+    # cache_warmup — заполнение кэша расписаний переговорок,
+    # cache_cleanup — удаление устаревших записей кэшей (в том числе
+    # истёкших токенов).
+    scheduler_enabled: bool = False
+    scheduler_jitter: float = 30
+    job_archive_cron: Optional[str] = '15 3 * * *'
+    job_rollup_cron: Optional[str] = None
+    job_cache_warmup_interval: Optional[float] = None
+    job_cache_cleanup_interval: Optional[float] = 300
+    # Кэш расписаний переговорок: время жизни записи в секундах
+    # и максимальное число переговорок в кэше (0 — кэш выключен).
+    room_reservations_cache_ttl: float = 30
+    room_reservations_cache_size: int = 1024
+    # Подписки на изменения бронирований (GET /meeting_rooms/events):
+    # сколько событий может ждать отправки одному подписчику, прежде
+    # чем его отключат как медленного, и раз в сколько секунд
+    # отправлять пустой кадр, чтобы прокси не закрывали соединение.
+    room_events_queue_size: int = 100
+    room_events_keepalive: float = 15
+    # Кэш проверенных JWT: сколько секунд (не дольше срока действия
+    # токена) и для скольких токенов хранить пользователя, чтобы
+    # не читать его из базы на каждом запросе (0 — кэш выключен).
+    user_token_cache_ttl: float = 60
+    user_token_cache_size: int = 10000
+    # Доверять данным пользователя, записанным в самом токене, и совсем
+    # не обращаться к базе. Изменения пользователя (например, блокировка)
+    # тогда вступают в силу только после истечения токена.
+    jwt_trust_claims: bool = False
+    # Хеширование паролей: алгоритм, число раундов (None — значение
+    # алгоритма по умолчанию) и размер пула потоков, в котором считаются
+    # хеши (0 — считать в потоке event loop).
+    password_hash_scheme: Literal['bcrypt', 'argon2', 'pbkdf2_sha256'] = (
+        'bcrypt'
+    )
+    password_hash_rounds: Optional[int] = None
+    password_hash_workers: int = 4
+    # Число asyncio-блокировок, между которыми распределяются переговорки
+    # при проверке и записи бронирований.
+    room_lock_stripes: int = 64
+    # Пул соединений с базой данных: постоянные соединения, сколько
+    # можно открыть сверх них при пиковой нагрузке, сколько секунд ждать
+    # свободного соединения и через сколько секунд пересоздавать
+    # соединение (-1 — не пересоздавать). pre_ping проверяет соединение
+    # перед выдачей из пула, чтобы не получить разорванное сервером.
+    # db_pool_size=0 — без пула, новое соединение на каждую сессию.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Добавлять к ответам заголовок X-DB-Checkouts — сколько раз
+    # за запрос бралось соединение из пула.
+    debug_db_checkouts: bool = False
+    # Собирать метрики времени запросов, SQL и валидаторов,
+    # отдавать их на /metrics и в заголовке Server-Timing.
+    metrics_enabled: bool = False
+    # Отладочный журнал SQL: запросы дольше slow_query_threshold_ms
+    # пишутся в лог с параметрами и планом выполнения, а HTTP-запросы,
+    # выполнившие один и тот же запрос больше n_plus_one_threshold раз,
+    # помечаются как возможный N+1.
+    query_debug: bool = False
+    slow_query_threshold_ms: float = 100
+    n_plus_one_threshold: int = 10
+    # Настройки SQLite, применяемые к каждому новому соединению.
+    # WAL позволяет читать во время записи; synchronous=NORMAL в режиме
+    # WAL не теряет целостность и сильно ускоряет commit; mmap_size —
+    # байты файла базы, отображаемые в память; cache_size — страничный
+    # кэш (отрицательное значение — в килобайтах); busy_timeout —
+    # сколько миллисекунд ждать освобождения блокировки записи.
+    sqlite_wal: bool = True
+    sqlite_synchronous: Literal['OFF', 'NORMAL', 'FULL'] = 'NORMAL'
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64000
+    sqlite_busy_timeout: int = 5000
 
     class Config:
         """
@@ -2,10 +2,17 @@
 # Все классы и функции для асинхронной работы
 # находятся в модуле sqlalchemy.ext.asyncio.
 # Добавляем импорт классов для определения столбца ID.
-from sqlalchemy import Column, Integer
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from app.core import metrics, query_log
 from app.core.config import settings
 
 
@@ -28,9 +35,137 @@ class PreBase:
 # В качестве основы для базового класса укажем класс PreBase.
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
 
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
+def get_engine_options(database_url: str) -> dict:
+    """
+    Параметры пула соединений из настроек.
+
+    Для файла SQLite драйвер aiosqlite по умолчанию не держит пул
+    (NullPool) и открывает новое соединение на каждую сессию — вместе
+    с потоком и выполнением PRAGMA. Указываем обычный пул явно.
+    Для SQLite в памяти SQLAlchemy использует пул из одного соединения,
+    который эти параметры не принимает. db_pool_size=0 отключает пул:
+    соединение открывается на каждую сессию.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database in (
+        None, '', ':memory:'
+    ):
+        return {}
+    if settings.db_pool_size == 0:
+        return {'poolclass': NullPool}
+    return {
+        'poolclass': AsyncAdaptedQueuePool,
+        'pool_size': settings.db_pool_size,
+        'max_overflow': settings.db_max_overflow,
+        'pool_timeout': settings.db_pool_timeout,
+        'pool_recycle': settings.db_pool_recycle,
+        'pool_pre_ping': settings.db_pool_pre_ping,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Обработчик события connect: настраивает каждое новое соединение SQLite.
+
+    PRAGMA действуют только в рамках соединения (кроме journal_mode,
+    который сохраняется в файле базы), поэтому их нужно выполнять
+    при каждом подключении, а не один раз.
+    """
+    cursor = dbapi_connection.cursor()
+    if settings.sqlite_wal:
+        cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f'PRAGMA synchronous={settings.sqlite_synchronous}')
+    cursor.execute(f'PRAGMA mmap_size={settings.sqlite_mmap_size:d}')
+    cursor.execute(f'PRAGMA cache_size={settings.sqlite_cache_size:d}')
+    cursor.execute(f'PRAGMA busy_timeout={settings.sqlite_busy_timeout:d}')
+    cursor.close()
+
+
+engine = create_async_engine(
+    settings.database_url, **get_engine_options(settings.database_url)
+)
+if engine.dialect.name == 'sqlite':
+    # События пула доступны только у синхронного движка,
+    # который лежит в основе асинхронного.
+    event.listen(engine.sync_engine, 'connect', set_sqlite_pragmas)
+
+# Счётчик соединений, выданных пулом в рамках текущего HTTP-запроса.
+# Middleware кладёт сюда список из одного числа, обработчик события
+# checkout увеличивает его; вне запроса значение None.
+pool_checkouts: ContextVar[Optional[list[int]]] = ContextVar(
+    'pool_checkouts', default=None
+)
+
+
+def count_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    """Обработчик события checkout: учитывает выдачу соединения из пула."""
+    counter = pool_checkouts.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+if settings.debug_db_checkouts:
+    event.listen(engine.sync_engine, 'checkout', count_pool_checkout)
+
+# Получатели времени каждого SQL-запроса: метрики (metrics_enabled)
+# и журнал медленных и повторяющихся запросов (query_debug).
+# Время измеряется один раз и передаётся всем включённым получателям.
+query_recorders = [
+    record_query
+    for enabled, record_query in (
+        (settings.metrics_enabled, metrics.record_query),
+        (settings.query_debug, query_log.record_query),
+    )
+    if enabled
+]
+
+
+def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+):
+    """Обработчик события движка: запоминает время начала запроса."""
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+):
+    """Обработчик события движка: передаёт время запроса получателям."""
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    for record_query in query_recorders:
+        record_query(conn, statement, parameters, executemany, elapsed)
+
+
+def handle_error(context):
+    """
+    Обработчик события движка: запрос завершился ошибкой.
+
+    after_cursor_execute в этом случае не вызывается, поэтому время
+    начала запроса снимаем здесь — иначе оно осталось бы в conn.info
+    соединения, вернувшегося в пул.
+    """
+    if context.connection is None:
+        return
+    started = context.connection.info.get('query_started')
+    if started:
+        started.pop()
+
+
+if query_recorders:
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    event.listen(
+        engine.sync_engine, 'after_cursor_execute', after_cursor_execute
+    )
+    event.listen(engine.sync_engine, 'handle_error', handle_error)
+
+# expire_on_commit=False: после commit() объекты не помечаются устаревшими,
+# и их атрибуты не нужно перечитывать из базы, чтобы отдать в ответе.
+AsyncSessionLocal = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
 # Асинхронный генератор сессий.
@@ -45,6 +180,12 @@ async def get_async_session():
     слово yield.
     Асинхронная функция, в которой содержится ключевое слово yield,
     называется «асинхронным генератором».
+
+    Сессия ленивая: соединение берётся из пула только при первом запросе
+    к базе, поэтому обработчики, которые отвечают из кэша, базу
+    не трогают. FastAPI кэширует зависимости в пределах HTTP-запроса,
+    так что зависимости аутентификации (get_user_db) и сам эндпоинт
+    получают одну и ту же сессию.
     """
     # Через асинхронный контекстный менеджер и sessionmaker
     # открывается сессия.
@@ -0,0 +1,103 @@
+"""
+Рассылка изменений бронирований подписчикам внутри процесса.
+
+Табло у переговорок раньше опрашивали расписание каждые несколько
+секунд. Теперь они подписываются на переговорки через Server-Sent Events
+(GET /meeting_rooms/events) и получают только изменения: CRUD-слой после
+каждой записи публикует событие в брокер, а брокер раскладывает его
+по очередям подписчиков этих переговорок.
+
+Событие сериализуется один раз, в готовый кадр SSE, и одни и те же
+байты кладутся во все очереди. Очередь каждого подписчика ограничена:
+если клиент не успевает читать и очередь переполнилась, брокер
+отключает его, а не копит события в памяти и не задерживает остальных.
+Клиент получает событие overflow и переподключается, заново получив
+текущее расписание.
+
+Брокер работает в памяти процесса: при нескольких воркерах подписчик
+получает только изменения, записанные его процессом, поэтому, как
+и с SQLite, приложение с подписками нужно запускать с одним воркером.
+"""
+import asyncio
+from typing import Any, Iterable, Optional
+
+import orjson
+
+from app.core.config import settings
+
+# Кадр, который получает отключённый за медленное чтение подписчик.
+OVERFLOW_FRAME = b'event: overflow\ndata: {}\n\n'
+
+
+def sse_frame(event: str, data: Any) -> bytes:
+    """Событие в формате Server-Sent Events."""
+    return b'event: %s\ndata: %s\n\n' % (event.encode(), orjson.dumps(data))
+
+
+class Subscription:
+    """Очередь кадров одного подписчика и его переговорки."""
+
+    def __init__(self, room_ids: Iterable[int], queue_size: int):
+        self.room_ids = frozenset(room_ids)
+        # None в очереди — конец потока.
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self.overflowed = False
+
+    def close(self) -> None:
+        """
+        Завершает поток подписчика: недоставленные кадры отбрасываются,
+        чтобы конец потока поместился в очередь и клиент узнал о нём сразу.
+        """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Следующий кадр; b'' — если за timeout секунд ничего не пришло."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return b''
+
+
+class RoomEventBroker:
+    """Подписки на события переговорок."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscriptions: dict[int, set[Subscription]] = {}
+
+    def subscribe(self, room_ids: Iterable[int]) -> Subscription:
+        subscription = Subscription(room_ids, self.queue_size)
+        for room_id in subscription.room_ids:
+            self.subscriptions.setdefault(room_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for room_id in subscription.room_ids:
+            subscribers = self.subscriptions.get(room_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[room_id]
+
+    def publish(self, room_id: int, event: str, data: dict) -> None:
+        """Отправляет событие подписчикам переговорки room_id."""
+        subscribers = self.subscriptions.get(room_id)
+        if not subscribers:
+            return
+        frame = sse_frame(event, data)
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Медленный клиент: отключаем, вместо того чтобы
+                # копить для него события.
+                self.unsubscribe(subscription)
+                subscription.overflowed = True
+                subscription.close()
+
+
+room_events = RoomEventBroker(settings.room_events_queue_size)
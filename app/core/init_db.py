@@ -15,6 +15,7 @@ from pydantic import EmailStr
 from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import get_user_db, get_user_manager
+from app.crud.reservation import reservation_crud
 from app.schemas.user import UserCreate
 
 # Превращаем асинхронные генераторы в асинхронные менеджеры контекста.
@@ -65,3 +66,10 @@ async def create_first_superuser():
             password=settings.first_superuser_password,
             is_superuser=True,
         )
+
+
+# Корутина, заполняющая индекс бронирований в памяти, если он включён.
+async def warm_up_reservation_index():
+    if settings.reservation_index_mode != 'off':
+        async with get_async_session_context() as session:
+            await reservation_crud.warm_up_index(session)
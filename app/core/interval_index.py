@@ -0,0 +1,131 @@
+"""
+Индекс бронирований в памяти процесса.
+
+Для каждой переговорки хранится отсортированный по началу список
+интервалов. Пока интервалы одной переговорки не пересекаются между собой,
+их концы тоже отсортированы, и проверка пересечения сводится к одному
+бинарному поиску — O(log n) без обращения к базе данных.
+
+Индекс заполняется при старте приложения и обновляется методами
+reservation_crud.create/update/remove. Он знает только о записях,
+сделанных в текущем процессе, поэтому при нескольких воркерах его
+нужно держать выключенным или в режиме сверки.
+"""
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Optional
+
+
+class RoomIntervals:
+    """Отсортированные интервалы бронирований одной переговорки."""
+
+    __slots__ = ('starts', 'items', 'disjoint')
+
+    def __init__(self):
+        # Параллельные списки: starts нужен для bisect,
+        # items хранит кортежи (from_reserve, to_reserve, id).
+        self.starts: list[datetime] = []
+        self.items: list[tuple[datetime, datetime, int]] = []
+        self.disjoint = True
+
+    def add(self, from_reserve: datetime, to_reserve: datetime, obj_id: int):
+        item = (from_reserve, to_reserve, obj_id)
+        position = bisect_right(self.items, item)
+        self.items.insert(position, item)
+        self.starts.insert(position, from_reserve)
+        # Проверяем соседей: пересечение с ними ломает упорядоченность
+        # концов интервалов, и быстрый поиск становится неверным.
+        if position > 0 and self.items[position - 1][1] >= from_reserve:
+            self.disjoint = False
+        if (position + 1 < len(self.items)
+                and self.items[position + 1][0] <= to_reserve):
+            self.disjoint = False
+
+    def remove(self, obj_id: int) -> None:
+        for position, item in enumerate(self.items):
+            if item[2] == obj_id:
+                del self.items[position]
+                del self.starts[position]
+                break
+        if not self.disjoint:
+            self.disjoint = all(
+                left[1] < right[0]
+                for left, right in zip(self.items, self.items[1:])
+            )
+
+    def has_conflict(
+            self,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            exclude_id: Optional[int] = None,
+    ) -> bool:
+        # Кандидаты на пересечение — интервалы, начавшиеся не позже
+        # to_reserve; из них пересекаются только последние, так как
+        # концы отсортированы. Один из них может оказаться самим
+        # редактируемым бронированием, поэтому смотрим максимум два.
+        position = bisect_right(self.starts, to_reserve)
+        for item in self.items[max(position - 2, 0):position][::-1]:
+            if item[2] == exclude_id:
+                continue
+            return item[1] >= from_reserve
+        return False
+
+
+class ReservationIntervalIndex:
+    """Индекс интервалов бронирований по всем переговоркам."""
+
+    def __init__(self):
+        self.rooms: dict[int, RoomIntervals] = {}
+        # Пока индекс не заполнен из базы, он не может отвечать на запросы.
+        self.ready = False
+        self.mismatches = 0
+
+    def load(self, rows: Iterable[tuple[int, int, datetime, datetime]]):
+        """Заполняет индекс строками (id, meetingroom_id, from, to)."""
+        self.rooms = {}
+        for obj_id, room_id, from_reserve, to_reserve in rows:
+            self.add(obj_id, room_id, from_reserve, to_reserve)
+        self.ready = True
+
+    def add(
+            self,
+            obj_id: int,
+            room_id: int,
+            from_reserve: datetime,
+            to_reserve: datetime,
+    ) -> None:
+        self.rooms.setdefault(room_id, RoomIntervals()).add(
+            from_reserve, to_reserve, obj_id
+        )
+
+    def remove(self, obj_id: int, room_id: int) -> None:
+        room = self.rooms.get(room_id)
+        if room is not None:
+            room.remove(obj_id)
+
+    def has_conflict(
+            self,
+            *,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            meetingroom_id: int,
+            reservation_id: Optional[int] = None,
+    ) -> Optional[bool]:
+        """
+        Отвечает, есть ли пересечение с уже забронированными интервалами.
+
+        Возвращает None, если индекс не может ответить (ещё не заполнен
+        или интервалы переговорки пересекаются между собой) — тогда
+        вызывающий код должен выполнить SQL-запрос.
+        """
+        if not self.ready:
+            return None
+        room = self.rooms.get(meetingroom_id)
+        if room is None:
+            return False
+        if not room.disjoint:
+            return None
+        return room.has_conflict(from_reserve, to_reserve, reservation_id)
+
+
+reservation_index = ReservationIntervalIndex()
@@ -0,0 +1,108 @@
+"""
+Операции над интервалами бронирований без обращения к базе данных.
+
+Интервалы задаются парами (from_reserve, to_reserve); границы включаются,
+как и в проверке пересечений в CRUDReservation: бронирования,
+касающиеся друг друга концами, считаются пересекающимися.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Optional, Sequence
+
+Interval = tuple[datetime, datetime]
+
+
+def find_batch_conflicts(
+        items: Sequence[tuple[int, datetime, datetime]],
+        existing: Sequence[tuple[int, datetime, datetime]],
+) -> list[Optional[tuple[str, object]]]:
+    """
+    Проверяет пачку новых интервалов на пересечения.
+
+    items — новые интервалы (meetingroom_id, from_reserve, to_reserve),
+    existing — уже сохранённые интервалы в тех же переговорках.
+    Для каждого элемента items возвращает None, если он свободен,
+    ('existing', (from_reserve, to_reserve)) при пересечении с сохранённым
+    интервалом или ('batch', номер) при пересечении с другим элементом
+    пачки. Из двух пересекающихся элементов пачки принимается тот,
+    что начинается раньше, а при равном начале — тот, что раньше в пачке.
+
+    Сохранённые интервалы сортируются по началу, и для них считается
+    префиксный максимум концов; элементы пачки обходятся по возрастанию
+    начала одним проходом. Сложность — O((n + m) log m).
+    """
+    result: list[Optional[tuple[str, object]]] = [None] * len(items)
+    existing_by_room = {
+        room_id: sorted((start, end) for _, start, end in group)
+        for room_id, group in groupby(
+            sorted(existing, key=lambda row: row[0]), key=lambda row: row[0]
+        )
+    }
+    order = sorted(
+        range(len(items)),
+        key=lambda number: (items[number][0], items[number][1], number),
+    )
+    for room_id, numbers in groupby(
+            order, key=lambda number: items[number][0]
+    ):
+        intervals = existing_by_room.get(room_id, [])
+        starts = [start for start, _ in intervals]
+        # Для каждого префикса — интервал с самым поздним концом.
+        latest: list[Interval] = []
+        for interval in intervals:
+            if not latest or interval[1] > latest[-1][1]:
+                latest.append(interval)
+            else:
+                latest.append(latest[-1])
+        accepted_end: Optional[datetime] = None
+        accepted_number: Optional[int] = None
+        for number in numbers:
+            _, from_reserve, to_reserve = items[number]
+            position = bisect_right(starts, to_reserve)
+            if position and latest[position - 1][1] >= from_reserve:
+                result[number] = ('existing', latest[position - 1])
+            elif accepted_end is not None and accepted_end >= from_reserve:
+                result[number] = ('batch', accepted_number)
+            else:
+                # Принятые элементы не пересекаются и идут по возрастанию
+                # начала, поэтому последний из них заканчивается позже всех.
+                accepted_end, accepted_number = to_reserve, number
+    return result
+
+
+def find_free_slots(
+        busy: Iterable[tuple[int, datetime, datetime]],
+        window_from: datetime,
+        window_to: datetime,
+        duration: timedelta,
+) -> dict[int, list[Interval]]:
+    """
+    Находит свободные промежутки длиннее duration в окне.
+
+    busy — занятые интервалы (meetingroom_id, from_reserve, to_reserve)
+    в любом порядке; после сортировки каждая переговорка обходится
+    одним проходом, где курсор сдвигается к концу очередного занятого
+    интервала. Промежуток — это весь разрыв [конец, начало следующего],
+    а границы включаются: бронирование, которое его займёт, должно
+    начинаться позже его начала и заканчиваться раньше его конца.
+    Поэтому промежуток ровно в duration не подходит и не возвращается.
+    Переговорки без бронирований в результат не попадают —
+    у них свободно всё окно.
+    """
+    slots: dict[int, list[Interval]] = {}
+    # Ключ из itemgetter сравнивает обычные кортежи, а не строки
+    # результата запроса, — так сортировка заметно быстрее.
+    for room_id, intervals in groupby(
+        sorted(busy, key=itemgetter(0, 1)), key=itemgetter(0)
+    ):
+        room_slots = slots[room_id] = []
+        cursor = window_from
+        for _, from_reserve, to_reserve in intervals:
+            if from_reserve - cursor > duration:
+                room_slots.append((cursor, from_reserve))
+            cursor = max(cursor, to_reserve)
+        if window_to - cursor > duration:
+            room_slots.append((cursor, window_to))
+    return slots
@@ -0,0 +1,67 @@
+"""
+Фоновые задачи обслуживания, которые выполняет планировщик приложения.
+
+Задачи и их расписания задаются настройками job_*; планировщик
+запускается при старте приложения, если включена настройка
+scheduler_enabled. Те же действия можно выполнить вручную:
+    python -m app.core.archive
+    python -m app.core.backfill
+"""
+from app.api.projections import load_room_schedule
+from app.core.archive import archive_reservations
+from app.core.backfill import backfill_room_daily_usage
+from app.core.cache import room_reservations_cache, user_token_cache
+from app.core.config import settings
+from app.core.init_db import get_async_session_context
+from app.core.scheduler import Scheduler
+from app.crud.meeting_room import meeting_room_crud
+
+
+async def archive_job() -> None:
+    await archive_reservations(settings.reservation_retention_days)
+
+
+async def warm_up_room_reservations_cache() -> None:
+    """
+    Заполняет кэш расписаний переговорок, чтобы первый запрос
+    расписания после истечения записи не ждал базу.
+    """
+    async with get_async_session_context() as session:
+        rows = await meeting_room_crud.get_multi_rows(
+            session, ['id'], limit=room_reservations_cache.maxsize
+        )
+        for (room_id,) in rows:
+            room_reservations_cache.set(
+                room_id, await load_room_schedule(room_id, session)
+            )
+
+
+async def purge_expired_cache_entries() -> None:
+    """Удаляет из кэшей устаревшие записи, в том числе истёкшие токены."""
+    user_token_cache.purge_expired()
+    room_reservations_cache.purge_expired()
+
+
+scheduler = Scheduler()
+# Кэши свои у каждого процесса, поэтому задачи с ними выполняются
+# в каждом процессе, без аренды (lease=False).
+for name, func, every, cron, lease in (
+    ('archive', archive_job, None, settings.job_archive_cron, True),
+    (
+        'rollup', backfill_room_daily_usage,
+        None, settings.job_rollup_cron, True,
+    ),
+    (
+        'cache_warmup', warm_up_room_reservations_cache,
+        settings.job_cache_warmup_interval, None, False,
+    ),
+    (
+        'cache_cleanup', purge_expired_cache_entries,
+        settings.job_cache_cleanup_interval, None, False,
+    ),
+):
+    if every is not None or cron is not None:
+        scheduler.add_job(
+            name, func, every=every, cron=cron,
+            jitter=settings.scheduler_jitter, lease=lease,
+        )
@@ -0,0 +1,248 @@
+"""
+Метрики времени обработки запросов.
+
+Для каждого HTTP-запроса собирается, сколько времени заняли SQL-запросы
+(события движка SQLAlchemy, см. app/core/db.py) и валидаторы check_*
+(декоратор timed_validator). Middleware в app/main.py складывает эти
+данные в гистограммы по маршрутам и добавляет к ответу заголовок
+Server-Timing; эндпоинт /metrics отдаёт накопленное в текстовом формате
+Prometheus. Туда же попадают длительности фоновых задач планировщика
+(app/core/scheduler.py).
+
+Всё это включается настройкой metrics_enabled; когда она выключена,
+декоратор возвращает функцию без изменений и ничего не стоит.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Optional
+
+from app.core.config import settings
+
+# Границы корзин гистограмм в секундах — те же, что у клиентов Prometheus.
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class Histogram:
+    """Гистограмма Prometheus: счётчики по корзинам, сумма и количество."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for position, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            lines.append(
+                f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+@dataclass
+class RequestTimings:
+    """Данные одного HTTP-запроса, собранные по ходу обработки."""
+
+    started: float = field(default_factory=time.perf_counter)
+    sql_count: int = 0
+    sql_time: float = 0.0
+    validate_time: float = 0.0
+    # Глубина вложенных валидаторов: в validate_time учитывается
+    # только внешний вызов.
+    validate_depth: int = 0
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'current_timings', default=None
+)
+
+
+class MetricsRegistry:
+    """Накопленные метрики процесса."""
+
+    def __init__(self):
+        self.request_duration: dict[tuple[str, str], Histogram] = {}
+        self.sql_statements: dict[tuple[str, str], int] = {}
+        self.sql_duration: dict[tuple[str, str], float] = {}
+        self.validator_duration: dict[str, Histogram] = {}
+        self.job_duration: dict[tuple[str, str], Histogram] = {}
+        self.job_skipped: dict[str, int] = {}
+
+    def observe_request(
+            self, method: str, route: str, timings: RequestTimings
+    ) -> float:
+        """Учитывает завершённый запрос и возвращает его длительность."""
+        elapsed = time.perf_counter() - timings.started
+        key = (method, route)
+        self.request_duration.setdefault(key, Histogram()).observe(elapsed)
+        self.sql_statements[key] = (
+            self.sql_statements.get(key, 0) + timings.sql_count
+        )
+        self.sql_duration[key] = (
+            self.sql_duration.get(key, 0.0) + timings.sql_time
+        )
+        return elapsed
+
+    def observe_validator(self, name: str, elapsed: float) -> None:
+        self.validator_duration.setdefault(name, Histogram()).observe(elapsed)
+
+    def observe_job(self, name: str, status: str, elapsed: float) -> None:
+        self.job_duration.setdefault((name, status), Histogram()).observe(
+            elapsed
+        )
+
+    def observe_job_skipped(self, name: str) -> None:
+        """Учитывает запуск, пропущенный из-за аренды другим процессом."""
+        self.job_skipped[name] = self.job_skipped.get(name, 0) + 1
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        lines = [
+            '# HELP http_request_duration_seconds '
+            'HTTP request latency by route.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, route), histogram in sorted(
+            self.request_duration.items()
+        ):
+            lines += histogram.render(
+                'http_request_duration_seconds',
+                f'method="{method}",route="{route}"',
+            )
+        lines += [
+            '# HELP db_statements_total SQL statements executed by route.',
+            '# TYPE db_statements_total counter',
+        ]
+        for (method, route), count in sorted(self.sql_statements.items()):
+            lines.append(
+                f'db_statements_total{{method="{method}",route="{route}"}} '
+                f'{count}'
+            )
+        lines += [
+            '# HELP db_statement_duration_seconds_total '
+            'Time spent in SQL statements by route.',
+            '# TYPE db_statement_duration_seconds_total counter',
+        ]
+        for (method, route), total in sorted(self.sql_duration.items()):
+            lines.append(
+                'db_statement_duration_seconds_total'
+                f'{{method="{method}",route="{route}"}} {total}'
+            )
+        lines += [
+            '# HELP validator_duration_seconds '
+            'Time spent in check_* validators.',
+            '# TYPE validator_duration_seconds histogram',
+        ]
+        for name, histogram in sorted(self.validator_duration.items()):
+            lines += histogram.render(
+                'validator_duration_seconds', f'validator="{name}"'
+            )
+        lines += [
+            '# HELP scheduler_job_duration_seconds '
+            'Background job run time by status.',
+            '# TYPE scheduler_job_duration_seconds histogram',
+        ]
+        for (name, status), histogram in sorted(self.job_duration.items()):
+            lines += histogram.render(
+                'scheduler_job_duration_seconds',
+                f'job="{name}",status="{status}"',
+            )
+        lines += [
+            '# HELP scheduler_job_skipped_total '
+            'Background job runs skipped because another process '
+            'holds the lease.',
+            '# TYPE scheduler_job_skipped_total counter',
+        ]
+        for name, count in sorted(self.job_skipped.items()):
+            lines.append(
+                f'scheduler_job_skipped_total{{job="{name}"}} {count}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+def server_timing(timings: RequestTimings, elapsed: float) -> str:
+    """
+    Значение заголовка Server-Timing в миллисекундах.
+
+    Время SQL-запросов, выполненных внутри валидаторов, входит
+    и в db, и в validate.
+    """
+    return (
+        f'db;dur={timings.sql_time * 1000:.1f};'
+        f'desc="{timings.sql_count} queries", '
+        f'validate;dur={timings.validate_time * 1000:.1f}, '
+        f'total;dur={elapsed * 1000:.1f}'
+    )
+
+
+def record_query(conn, statement, parameters, executemany, elapsed):
+    """
+    Учитывает SQL-запрос в текущем HTTP-запросе. Время запроса
+    измеряет обработчик событий движка в app/core/db.py.
+    """
+    timings = current_timings.get()
+    if timings is not None:
+        timings.sql_count += 1
+        timings.sql_time += elapsed
+
+
+def timed_validator(func):
+    """Декоратор валидатора: учитывает время его выполнения."""
+    if not settings.metrics_enabled:
+        return func
+    name = func.__name__
+
+    def start():
+        timings = current_timings.get()
+        if timings is not None:
+            timings.validate_depth += 1
+        return timings, time.perf_counter()
+
+    def finish(timings, started):
+        elapsed = time.perf_counter() - started
+        metrics.observe_validator(name, elapsed)
+        if timings is not None:
+            timings.validate_depth -= 1
+            if not timings.validate_depth:
+                timings.validate_time += elapsed
+
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            timings, started = start()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                finish(timings, started)
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings, started = start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish(timings, started)
+    return wrapper
@@ -0,0 +1,313 @@
+"""
+Аналитика загрузки переговорок.
+
+Для каждой переговорки считается, сколько часов она забронирована
+в каждом дне или неделе окна и какую долю времени это составляет,
+а для всех переговорок вместе — тепловая карта загрузки по дням недели
+и часам.
+
+Время бронирований в отрезках окна считается не перебором пар
+«бронирование × отрезок», а через префиксные суммы. Занятое время
+от начала окна до момента b равно
+    I(b) = Σ (b − s) по началам s < b  −  Σ (b − e) по концам e < b,
+а занятое время отрезка [b1, b2) — разности I(b2) − I(b1). Для I(b)
+достаточно отсортированных начал и концов и их накопленных сумм, так
+что вся работа — сортировка и двоичный поиск: O((N + K) log N) для
+N бронирований и K границ отрезков.
+
+Если установлен NumPy, вычисления идут векторно сразу по всем
+переговоркам; иначе — тем же алгоритмом на bisect и itertools.
+Бронирования передаются как секунды Unix-времени, поэтому для
+миллиона строк не нужно создавать миллион объектов datetime.
+
+Отчёт по дням и неделям без тепловой карты строится и по суточной
+свёртке room_daily_usage (get_daily_usage_stats): строк в ней не больше,
+чем переговорок, умноженных на дни окна, сколько бы ни было бронирований.
+"""
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate, chain
+from typing import Iterable, Iterator, Literal, Optional
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy необязателен.
+    numpy = None
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+EPOCH = datetime(1970, 1, 1)
+# Отрезки отчёта: длина и сдвиг первой границы от начала эпохи.
+# 1 января 1970 года — четверг, первый понедельник — через 4 дня.
+PERIODS = {'day': (DAY, 0), 'week': (WEEK, 4 * DAY)}
+# Самое длинное окно отчёта.
+MAX_WINDOW_DAYS = 366
+
+
+def to_epoch(value: datetime) -> int:
+    """Время без часового пояса в секундах Unix-времени."""
+    return int((value - EPOCH).total_seconds())
+
+
+def get_boundaries(start: int, end: int, step: int, offset: int = 0):
+    """
+    Границы отрезков окна [start, end): начало окна, все моменты
+    offset + k·step внутри окна и конец окна.
+    """
+    first = start - (start - offset) % step + step
+    return [start, *range(first, end, step), end]
+
+
+def _covered_python(starts: list, ends: list, boundaries: list) -> list:
+    """Занятое время между соседними границами для одной группы."""
+    starts = sorted(starts)
+    ends = sorted(ends)
+    starts_sum = [0, *accumulate(starts)]
+    ends_sum = [0, *accumulate(ends)]
+    covered = []
+    for boundary in boundaries:
+        started = bisect_left(starts, boundary)
+        ended = bisect_left(ends, boundary)
+        covered.append(
+            boundary * started - starts_sum[started]
+            - boundary * ended + ends_sum[ended]
+        )
+    return [right - left for left, right in zip(covered, covered[1:])]
+
+
+def _stats_python(room_ids, rows, window, period_bounds, hour_bounds):
+    by_room = {room_id: ([], []) for room_id in room_ids}
+    all_starts, all_ends = [], []
+    for room_id, start, end in rows:
+        start = min(max(start - window[0], 0), window[1])
+        end = min(max(end - window[0], 0), window[1])
+        if start >= end or room_id not in by_room:
+            continue
+        starts, ends = by_room[room_id]
+        starts.append(start)
+        ends.append(end)
+        all_starts.append(start)
+        all_ends.append(end)
+    periods = [
+        _covered_python(starts, ends, period_bounds)
+        for starts, ends in by_room.values()
+    ]
+    hours = _covered_python(all_starts, all_ends, hour_bounds)
+    return periods, hours
+
+
+def _covered_numpy(starts, ends, boundaries):
+    """То же, что _covered_python, для массивов границ любой формы."""
+    starts = numpy.sort(starts)
+    ends = numpy.sort(ends)
+    starts_sum = numpy.concatenate(([0], numpy.cumsum(starts)))
+    ends_sum = numpy.concatenate(([0], numpy.cumsum(ends)))
+    started = numpy.searchsorted(starts, boundaries)
+    ended = numpy.searchsorted(ends, boundaries)
+    covered = (
+        boundaries * started - starts_sum[started]
+        - boundaries * ended + ends_sum[ended]
+    )
+    return numpy.diff(covered, axis=-1)
+
+
+def _stats_numpy(room_ids, rows, window, period_bounds, hour_bounds):
+    # fromiter по плоской последовательности намного быстрее, чем
+    # asarray() по списку строк результата запроса.
+    rows = numpy.fromiter(
+        chain.from_iterable(rows), dtype=numpy.int64
+    ).reshape(-1, 3)
+    room_ids = numpy.asarray(room_ids, dtype=numpy.int64)
+    order = numpy.argsort(room_ids)
+    position = numpy.searchsorted(room_ids, rows[:, 0], sorter=order)
+    position = numpy.minimum(position, len(room_ids) - 1)
+    starts = numpy.clip(rows[:, 1] - window[0], 0, window[1])
+    ends = numpy.clip(rows[:, 2] - window[0], 0, window[1])
+    keep = (room_ids[order[position]] == rows[:, 0]) & (starts < ends)
+    starts, ends = starts[keep], ends[keep]
+    # Интервалы всех переговорок кладём на одну ось, сдвигая каждую
+    # переговорку на свою длину окна. Вклад интервалов предыдущих
+    # переговорок в I(b) одинаков для всех границ следующей
+    # и сокращается в разностях.
+    shift_by_room = numpy.empty(len(room_ids), dtype=numpy.int64)
+    shift_by_room[order] = numpy.arange(len(room_ids)) * (window[1] + 1)
+    shift = shift_by_room[order[position[keep]]]
+    period_bounds = numpy.asarray(period_bounds, dtype=numpy.int64)
+    periods = _covered_numpy(
+        starts + shift, ends + shift,
+        shift_by_room[:, None] + period_bounds[None, :],
+    )
+    hours = _covered_numpy(
+        starts, ends, numpy.asarray(hour_bounds, dtype=numpy.int64)
+    )
+    return periods.tolist(), hours.tolist()
+
+
+def split_by_day(
+        from_reserve: datetime, to_reserve: datetime
+) -> Iterator[tuple[date, int]]:
+    """Части интервала по календарным дням: пары (день, секунды)."""
+    current = from_reserve
+    while current < to_reserve:
+        next_day = datetime.combine(current.date() + timedelta(days=1), time())
+        end = min(next_day, to_reserve)
+        yield current.date(), int((end - current).total_seconds())
+        current = end
+
+
+def _get_room_usage(room_id, name, booked, period_starts, period_lengths):
+    """Строка отчёта для одной переговорки: итог и отрезки."""
+    total = sum(booked)
+    return {
+        'id': room_id,
+        'name': name,
+        'booked_hours': round(total / HOUR, 3),
+        'utilization': round(total / sum(period_lengths), 4),
+        'periods': [
+            {
+                'start': start,
+                'booked_hours': round(seconds / HOUR, 3),
+                'utilization': round(seconds / period_length, 4),
+            }
+            for start, seconds, period_length in zip(
+                period_starts, booked, period_lengths
+            )
+        ],
+    }
+
+
+def get_occupancy_stats(
+        rooms: Iterable[tuple[int, str]],
+        rows: Iterable[tuple[int, int, int]],
+        from_time: datetime,
+        to_time: datetime,
+        granularity: Literal['day', 'week'],
+        use_numpy: Optional[bool] = None,
+) -> dict:
+    """
+    Загрузка переговорок rooms (пары id, name) в окне [from_time, to_time).
+
+    rows — бронирования (meetingroom_id, начало, конец) в секундах
+    Unix-времени; части за пределами окна отбрасываются. Отрезки
+    отчёта выровнены по полуночи (day) или полуночи понедельника (week),
+    крайние отрезки могут быть неполными.
+
+    use_numpy выбирает реализацию; по умолчанию NumPy используется,
+    если он установлен.
+    """
+    if use_numpy and numpy is None:
+        raise RuntimeError('use_numpy=True, но NumPy не установлен.')
+    rooms = list(rooms)
+    room_ids = [room_id for room_id, _ in rooms]
+    window_start = to_epoch(from_time)
+    length = to_epoch(to_time) - window_start
+    step, offset = PERIODS[granularity]
+    period_bounds = [
+        bound - window_start for bound in get_boundaries(
+            window_start, window_start + length, step, offset
+        )
+    ]
+    hour_bounds = [
+        bound - window_start for bound in get_boundaries(
+            window_start, window_start + length, HOUR
+        )
+    ]
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if not rooms:
+        periods, hours = [], [0] * (len(hour_bounds) - 1)
+    elif use_numpy:
+        periods, hours = _stats_numpy(
+            room_ids, rows, (window_start, length),
+            period_bounds, hour_bounds,
+        )
+    else:
+        periods, hours = _stats_python(
+            room_ids, rows, (window_start, length),
+            period_bounds, hour_bounds,
+        )
+
+    period_lengths = [
+        right - left for left, right in zip(period_bounds, period_bounds[1:])
+    ]
+    period_starts = [
+        (from_time + timedelta(seconds=bound)).isoformat()
+        for bound in period_bounds[:-1]
+    ]
+    rooms_stats = [
+        _get_room_usage(room_id, name, booked, period_starts, period_lengths)
+        for (room_id, name), booked in zip(rooms, periods)
+    ]
+
+    # Тепловая карта: занятое время каждого часа окна складывается
+    # в ячейку (день недели, час) вместе с доступным временем ячейки.
+    booked_slots = [[0] * 24 for _ in range(7)]
+    available_slots = [[0] * 24 for _ in range(7)]
+    for left, right, seconds in zip(hour_bounds, hour_bounds[1:], hours):
+        moment = from_time + timedelta(seconds=left)
+        booked_slots[moment.weekday()][moment.hour] += seconds
+        available_slots[moment.weekday()][moment.hour] += (
+            (right - left) * len(rooms)
+        )
+    heatmap = [
+        [
+            round(booked / available, 4) if available else None
+            for booked, available in zip(booked_row, available_row)
+        ]
+        for booked_row, available_row in zip(booked_slots, available_slots)
+    ]
+    return {
+        'from_time': from_time.isoformat(),
+        'to_time': to_time.isoformat(),
+        'granularity': granularity,
+        'available_hours': round(length / HOUR, 3),
+        'rooms': rooms_stats,
+        'heatmap': heatmap,
+    }
+
+
+def get_daily_usage_stats(
+        rooms: Iterable[tuple[int, str]],
+        rows: Iterable[tuple[int, date, int]],
+        from_day: date,
+        to_day: date,
+        granularity: Literal['day', 'week'],
+) -> dict:
+    """
+    Загрузка переговорок по суточной свёртке room_daily_usage
+    за дни [from_day, to_day): тот же отчёт, что get_occupancy_stats(),
+    но без тепловой карты по часам.
+
+    rows — строки свёртки (meetingroom_id, день, секунды); их не больше,
+    чем переговорок, умноженных на дни окна.
+    """
+    days = (to_day - from_day).days
+    # Номер отрезка отчёта для каждого дня окна.
+    period_of_day = []
+    period_starts = []
+    period_lengths = []
+    for number in range(days):
+        day = from_day + timedelta(days=number)
+        if not period_starts or granularity == 'day' or day.weekday() == 0:
+            period_starts.append(datetime.combine(day, time()).isoformat())
+            period_lengths.append(0)
+        period_of_day.append(len(period_starts) - 1)
+        period_lengths[-1] += DAY
+    booked = {room_id: [0] * len(period_starts) for room_id, _ in rooms}
+    for room_id, day, seconds in rows:
+        number = (day - from_day).days
+        if room_id in booked and 0 <= number < days:
+            booked[room_id][period_of_day[number]] += seconds
+    return {
+        'from_time': datetime.combine(from_day, time()).isoformat(),
+        'to_time': datetime.combine(to_day, time()).isoformat(),
+        'granularity': granularity,
+        'available_hours': days * 24,
+        'rooms': [
+            _get_room_usage(
+                room_id, name, booked[room_id], period_starts, period_lengths
+            )
+            for room_id, name in rooms
+        ],
+    }
@@ -0,0 +1,86 @@
+"""
+Хеширование паролей.
+
+Алгоритм и его стоимость (число раундов) задаются в настройках.
+Хеши, созданные другим алгоритмом или с другим числом раундов, остаются
+рабочими: при успешном входе пароль перехешируется с текущими
+параметрами (см. UserManager.authenticate).
+
+Хеширование занимает десятки и сотни миллисекунд процессорного времени.
+Если выполнять его в потоке event loop, каждый вход в систему на это
+время останавливает обработку всех остальных запросов. Поэтому хеш
+считается в отдельном пуле потоков ограниченного размера: bcrypt,
+argon2 и pbkdf2 отпускают GIL на время вычисления, и пул процессов
+не нужен.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Tuple
+
+from fastapi_users.password import PasswordHelper
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# Алгоритмы, хеши которых принимаются при входе.
+SCHEMES = ('bcrypt', 'argon2', 'pbkdf2_sha256')
+
+
+def get_crypt_context(scheme: str, rounds: Optional[int]) -> CryptContext:
+    """
+    Контекст passlib: новые хеши создаются алгоритмом scheme,
+    остальные алгоритмы считаются устаревшими. Если задано число раундов,
+    хеши с другим числом раундов тоже требуют обновления.
+    """
+    options = {}
+    if rounds is not None:
+        for option in ('default_rounds', 'min_rounds', 'max_rounds'):
+            options[f'{scheme}__{option}'] = rounds
+    return CryptContext(
+        schemes=[scheme, *(other for other in SCHEMES if other != scheme)],
+        deprecated='auto',
+        **options,
+    )
+
+
+class AsyncPasswordHelper(PasswordHelper):
+    """
+    Помощник fastapi-users с асинхронными версиями hash и verify_and_update.
+
+    Синхронные методы остаются для кода библиотеки, который вызывается
+    редко (например, сброс пароля).
+    """
+
+    def __init__(self, context: CryptContext, workers: int):
+        super().__init__(context)
+        # workers=0 — хешировать в потоке event loop, как раньше.
+        self.executor = (
+            ThreadPoolExecutor(workers, thread_name_prefix='password-hash')
+            if workers else None
+        )
+
+    async def _run(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(func, *args)
+        )
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(self.hash, password)
+
+    async def verify_and_update_async(
+            self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            self.verify_and_update, plain_password, hashed_password
+        )
+
+
+password_helper = AsyncPasswordHelper(
+    get_crypt_context(
+        settings.password_hash_scheme, settings.password_hash_rounds
+    ),
+    settings.password_hash_workers,
+)
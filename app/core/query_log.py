@@ -0,0 +1,128 @@
+"""
+Отладочный журнал SQL-запросов.
+
+Включается настройкой query_debug и подключается к событиям движка
+в app/core/db.py, поэтому видит все запросы CRUD-слоя.
+
+Медленные запросы (дольше slow_query_threshold_ms) пишутся в лог вместе
+с параметрами, местом вызова в app/crud и планом выполнения:
+EXPLAIN QUERY PLAN в SQLite и EXPLAIN в PostgreSQL.
+
+Для N+1 запросы каждого HTTP-запроса группируются по тексту,
+в котором списки параметров IN (?, ?, ...) сведены к одному
+параметру. Если одинаковый запрос выполнился больше чем
+n_plus_one_threshold раз, в лог пишется предупреждение: скорее всего,
+данные читаются в цикле по одному объекту, а не одним запросом.
+"""
+import logging
+import re
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+import greenlet
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Счётчики запросов текущего HTTP-запроса по нормализованному тексту.
+current_statements: ContextVar[Optional[Counter]] = ContextVar(
+    'current_statements', default=None
+)
+
+PLACEHOLDER_LIST = re.compile(
+    r'\(\s*(?:\?|%s|\$\d+|:\w+)'
+    r'(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))*\s*\)'
+)
+SPACES = re.compile(r'\s+')
+EXPLAIN_PREFIXES = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+
+
+def normalize_statement(statement: str) -> str:
+    """Текст запроса без различий в числе параметров IN и в пробелах."""
+    return SPACES.sub(' ', PLACEHOLDER_LIST.sub('(?)', statement)).strip()
+
+
+def find_caller() -> str:
+    """
+    Место в CRUD-слое (или в другом коде app), откуда пришёл запрос.
+
+    Асинхронный движок выполняет запрос в дочернем greenlet, а корутины
+    приложения остаются на стеке родительского greenlet — его и смотрим.
+    """
+    current = greenlet.getcurrent()
+    stack_top = (
+        current.parent.gr_frame if current.parent is not None else None
+    )
+    frames = [
+        frame for frame in traceback.extract_stack(stack_top)
+        if '/app/' in frame.filename
+        and not frame.filename.endswith(('query_log.py', 'db.py'))
+    ]
+    for frame in reversed(frames):
+        if '/app/crud/' in frame.filename:
+            break
+    else:
+        if not frames:
+            return '<unknown>'
+        frame = frames[-1]
+    return f'{frame.filename}:{frame.lineno} in {frame.name}'
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """
+    План выполнения запроса.
+
+    Запрос выполняется через отдельный курсор DBAPI, минуя события
+    движка, чтобы EXPLAIN сам не попал в журнал.
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return '<EXPLAIN is not supported for this database>'
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return '\n'.join(
+            ' | '.join(str(value) for value in row)
+            for row in cursor.fetchall()
+        )
+    except Exception as error:
+        return f'<EXPLAIN failed: {error}>'
+    finally:
+        cursor.close()
+
+
+def record_query(conn, statement, parameters, executemany, elapsed):
+    """
+    Ищет медленные и повторяющиеся запросы. Время запроса измеряет
+    обработчик событий движка в app/core/db.py.
+    """
+    statements = current_statements.get()
+    if statements is not None:
+        statements[normalize_statement(statement)] += 1
+    if elapsed * 1000 < settings.slow_query_threshold_ms:
+        return
+    if executemany or not statement.lstrip().upper().startswith(
+        ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+    ):
+        plan = '<not explained>'
+    else:
+        plan = explain(conn, statement, parameters)
+    logger.warning(
+        'Slow query %.1f ms at %s\n%s\nparameters: %r\nplan:\n%s',
+        elapsed * 1000, find_caller(), statement, parameters, plan,
+    )
+
+
+def report_repeated_statements(
+        method: str, path: str, statements: Counter
+) -> None:
+    """Предупреждает о запросах, повторённых в HTTP-запросе слишком часто."""
+    for statement, count in statements.items():
+        if count > settings.n_plus_one_threshold:
+            logger.warning(
+                'Possible N+1: %s %s ran the same statement %d times: %s',
+                method, path, count, statement,
+            )
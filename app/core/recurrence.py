@@ -0,0 +1,132 @@
+"""
+Правила повторения бронирований.
+
+Серия хранится одной строкой: первое вхождение, частота, шаг и
+ограничение по количеству (count) или дате (until). Отдельные вхождения
+не сохраняются в базе — генератор вычисляет их на лету и только для
+запрошенного временного окна, сразу перескакивая к первому вхождению,
+попадающему в окно.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Collection, Iterator, Optional
+
+FREQUENCIES = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+# Максимальное число вхождений в одной серии: при создании серии
+# каждое вхождение проверяется на пересечения.
+MAX_OCCURRENCES = 1000
+
+
+@dataclass
+class ReservationOccurrence:
+    """
+    Одно вхождение серии.
+
+    Повторяет атрибуты модели Reservation, чтобы вхождения можно было
+    отдавать вместе с обычными бронированиями; собственного id у
+    вхождения нет, зато есть id серии.
+    """
+
+    from_reserve: datetime
+    to_reserve: datetime
+    meetingroom_id: int
+    user_id: Optional[int]
+    series_id: int
+    id: Optional[int] = None
+
+    def __repr__(self):
+        return (
+            f'Уже забронировано с {self.from_reserve} по {self.to_reserve}'
+        )
+
+
+def get_step(frequency: str, interval: int) -> timedelta:
+    return FREQUENCIES[frequency] * interval
+
+
+def count_occurrences(
+        from_reserve: datetime,
+        step: timedelta,
+        count: Optional[int],
+        until: Optional[datetime],
+) -> int:
+    """Число вхождений серии без учёта исключений."""
+    if count is not None:
+        return count
+    return (until - from_reserve) // step + 1
+
+
+def iter_occurrences(
+        *,
+        from_reserve: datetime,
+        to_reserve: datetime,
+        step: timedelta,
+        count: Optional[int],
+        until: Optional[datetime],
+        exceptions: Collection[datetime] = (),
+        window_from: datetime,
+        window_to: datetime,
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Лениво выдаёт интервалы вхождений, пересекающихся с окном.
+
+    Номер первого подходящего вхождения вычисляется сразу, поэтому
+    стоимость зависит от размера окна, а не от длины серии.
+    """
+    total = count_occurrences(from_reserve, step, count, until)
+    number = max(0, math.ceil((window_from - to_reserve) / step))
+    while number < total:
+        start = from_reserve + step * number
+        if start > window_to:
+            break
+        if start not in exceptions:
+            yield start, to_reserve + step * number
+        number += 1
+
+
+def get_last_end(
+        from_reserve: datetime,
+        to_reserve: datetime,
+        step: timedelta,
+        count: Optional[int],
+        until: Optional[datetime],
+) -> datetime:
+    """Конец последнего вхождения серии — для фильтрации по окну в SQL."""
+    return to_reserve + step * (
+        count_occurrences(from_reserve, step, count, until) - 1
+    )
+
+
+def expand_series(
+        series,
+        window_from: datetime,
+        window_to: datetime,
+) -> Iterator[ReservationOccurrence]:
+    """
+    Лениво выдаёт вхождения одной серии, пересекающиеся с окном.
+    series — объект модели ReservationSeries.
+    """
+    intervals = iter_occurrences(
+        from_reserve=series.from_reserve,
+        to_reserve=series.to_reserve,
+        step=get_step(series.frequency, series.interval),
+        count=series.count,
+        until=series.until,
+        exceptions={
+            datetime.fromisoformat(value) for value in series.exceptions
+        },
+        window_from=window_from,
+        window_to=window_to,
+    )
+    for from_reserve, to_reserve in intervals:
+        yield ReservationOccurrence(
+            from_reserve=from_reserve,
+            to_reserve=to_reserve,
+            meetingroom_id=series.meetingroom_id,
+            user_id=series.user_id,
+            series_id=series.id,
+        )
@@ -0,0 +1,79 @@
+"""
+Блокировки переговорок на время проверки и записи бронирования.
+
+Проверка пересечений и вставка — два отдельных запроса: без блокировки
+два одновременных запроса могут пройти проверку раньше, чем любой из них
+запишет своё бронирование, и переговорка окажется занята дважды.
+Поэтому проверка и запись выполняются под блокировкой переговорки.
+
+В процессе используется набор asyncio-блокировок («полосы»): переговорка
+попадает в полосу по остатку от деления id, так что запросы к разным
+переговоркам почти никогда не ждут друг друга, а память не растёт
+с числом переговорок. Несколько переговорок блокируются в порядке
+возрастания номеров полос — так две пачки не могут ждать друг друга
+по кругу.
+
+В PostgreSQL дополнительно берётся транзакционная advisory-блокировка
+на каждую переговорку: она действует между процессами и серверами
+и снимается при commit() или rollback(). Ограничение EXCLUDE USING gist
+здесь не подходит: вхождения повторяющихся серий не хранятся строками,
+и база не может сама проверить пересечение с ними.
+
+Для SQLite блокировки действуют только внутри одного процесса,
+поэтому приложение с SQLite нужно запускать с одним воркером.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# Первый ключ advisory-блокировки: отделяет блокировки переговорок
+# от других advisory-блокировок в той же базе.
+ROOM_LOCK_NAMESPACE = 1
+
+
+class RoomLocks:
+    """Фиксированный набор asyncio-блокировок, общий для всех переговорок."""
+
+    def __init__(self, stripes: int):
+        self.locks = [asyncio.Lock() for _ in range(stripes)]
+
+    def get_stripes(self, room_ids: Iterable[int]) -> list[int]:
+        return sorted({room_id % len(self.locks) for room_id in room_ids})
+
+    @asynccontextmanager
+    async def hold(self, room_ids: Iterable[int], session: AsyncSession):
+        """
+        Блокирует переговорки до выхода из контекста.
+
+        Запись нужно зафиксировать (commit) внутри контекста:
+        advisory-блокировка PostgreSQL снимается вместе с транзакцией.
+        """
+        room_ids = sorted(set(room_ids))
+        stripes = self.get_stripes(room_ids)
+        for acquired, stripe in enumerate(stripes):
+            try:
+                await self.locks[stripe].acquire()
+            except BaseException:
+                for held in stripes[:acquired]:
+                    self.locks[held].release()
+                raise
+        try:
+            if session.get_bind().dialect.name == 'postgresql':
+                for room_id in room_ids:
+                    await session.execute(select(
+                        func.pg_advisory_xact_lock(
+                            ROOM_LOCK_NAMESPACE, room_id
+                        )
+                    ))
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self.locks[stripe].release()
+
+
+room_locks = RoomLocks(settings.room_lock_stripes)
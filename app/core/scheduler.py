@@ -0,0 +1,249 @@
+"""
+Планировщик фоновых задач внутри процесса приложения.
+
+Задачи — корутины без аргументов, которые запускаются по интервалу
+(Interval) или по расписанию в формате cron (Cron). Каждая задача
+работает в своей asyncio-задаче в том же event loop, что и обработчики
+запросов: пока задача ждёт базу, запросы обслуживаются как обычно,
+поэтому сами задачи должны работать короткими порциями
+(как archive_finished() и backfill()).
+
+Если приложение запущено в нескольких процессах или на нескольких
+серверах, одну и ту же задачу в один момент должен выполнять только
+один из них. Для этого перед запуском задача «арендуется» в таблице
+job_lease до момента её следующего запуска: процессы, проснувшиеся
+позже, видят действующую аренду и пропускают этот запуск. Моменты
+запуска у всех процессов одинаковые — интервалы отсчитываются от начала
+эпохи, а не от старта процесса, — а случайная задержка jitter
+разносит их обращения к базе. Задачи, которые работают с состоянием
+самого процесса (например, с его кэшами), добавляются с lease=False:
+их выполняет каждый процесс, без аренды.
+
+Длительность и результат каждого запуска попадают в метрики
+(scheduler_job_duration_seconds), если они включены.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Union
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.occupancy import EPOCH
+from app.crud.job_lease import job_lease_crud
+
+logger = logging.getLogger(__name__)
+
+
+class Interval:
+    """Запуск каждые seconds секунд, в моменты, кратные интервалу."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError('Интервал задачи должен быть положительным.')
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        elapsed = (moment - EPOCH).total_seconds()
+        return EPOCH + timedelta(
+            seconds=(elapsed // self.seconds + 1) * self.seconds
+        )
+
+
+class Cron:
+    """
+    Расписание cron из пяти полей: минуты, часы, дни месяца, месяцы
+    и дни недели (0 и 7 — воскресенье). Поля поддерживают *, списки
+    через запятую, диапазоны a-b и шаг /n. Как и в cron, если заданы
+    и дни месяца, и дни недели, достаточно совпадения одного из них.
+    """
+
+    # Допустимые значения полей.
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != len(self.RANGES):
+            raise ValueError(
+                f'В расписании cron должно быть 5 полей: {expression!r}.'
+            )
+        self.expression = expression
+        (
+            self.minutes, self.hours, self.days, self.months, weekdays
+        ) = (
+            self._parse(field, low, high)
+            for field, (low, high) in zip(fields, self.RANGES)
+        )
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> set[int]:
+        values = set()
+        for part in field.split(','):
+            part, _, step = part.partition('/')
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = map(int, part.split('-'))
+            else:
+                start = int(part)
+                end = high if step else start
+            step = int(step or 1)
+            if not low <= start <= end <= high or step <= 0:
+                raise ValueError(f'Неверное поле расписания cron: {field!r}.')
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        # В cron неделя начинается с воскресенья, в datetime — с понедельника.
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday
+        if self.any_weekday:
+            return day
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Расписание вроде «30 февраля» никогда не срабатывает.
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (
+                    moment.replace(day=1) + timedelta(days=32)
+                ).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(
+            f'Расписание cron {self.expression!r} никогда не срабатывает.'
+        )
+
+
+@dataclass
+class Job:
+    """
+    Фоновая задача: корутина, расписание и случайная задержка запуска.
+    lease=False — задачу выполняет каждый процесс, без аренды.
+    """
+
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    schedule: Union[Interval, Cron]
+    jitter: float = 0
+    lease: bool = True
+
+
+class Scheduler:
+    """Набор фоновых задач процесса."""
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        # Владелец аренды: процесс на конкретном сервере.
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}'
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(
+            self,
+            name: str,
+            func: Callable[[], Awaitable[Any]],
+            *,
+            every: Optional[float] = None,
+            cron: Optional[str] = None,
+            jitter: float = 0,
+            lease: bool = True,
+    ) -> Job:
+        """Добавляет задачу с интервалом every секунд или расписанием cron."""
+        if (every is None) == (cron is None):
+            raise ValueError(
+                'Укажите ровно одно из расписаний: every или cron.'
+            )
+        job = Job(
+            name=name,
+            func=func,
+            schedule=Interval(every) if cron is None else Cron(cron),
+            jitter=jitter,
+            lease=lease,
+        )
+        self.jobs[name] = job
+        return job
+
+    async def run_job(self, job: Job, lease_until: datetime) -> bool:
+        """
+        Арендует задачу до lease_until и выполняет её.
+
+        Возвращает False, если задачу уже выполняет другой процесс.
+        Ошибки задачи пишутся в лог и не останавливают планировщик.
+        """
+        acquired = True
+        if job.lease:
+            async with AsyncSessionLocal() as session:
+                acquired = await job_lease_crud.acquire(
+                    job.name,
+                    self.owner,
+                    (lease_until - datetime.now()).total_seconds(),
+                    session,
+                )
+        if not acquired:
+            if settings.metrics_enabled:
+                metrics.observe_job_skipped(job.name)
+            return False
+        started = time.perf_counter()
+        try:
+            await job.func()
+        except Exception:
+            status = 'error'
+            logger.exception(
+                'Фоновая задача %s завершилась ошибкой.', job.name
+            )
+        else:
+            status = 'ok'
+        elapsed = time.perf_counter() - started
+        if settings.metrics_enabled:
+            metrics.observe_job(job.name, status, elapsed)
+        logger.info(
+            'Фоновая задача %s: %s за %.3f с.', job.name, status, elapsed
+        )
+        return True
+
+    async def _run_forever(self, job: Job) -> None:
+        while True:
+            run_at = job.schedule.next_after(datetime.now())
+            delay = (run_at - datetime.now()).total_seconds()
+            await asyncio.sleep(max(delay, 0) + random.uniform(0, job.jitter))
+            try:
+                await self.run_job(job, job.schedule.next_after(run_at))
+            except Exception:
+                # Например, база недоступна: пробуем при следующем запуске.
+                logger.exception(
+                    'Не удалось запустить фоновую задачу %s.', job.name
+                )
+
+    def start(self) -> None:
+        """Запускает все задачи; вызывается при старте приложения."""
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(
+                self._run_forever(job), name=f'job:{job.name}'
+            ))
+
+    async def stop(self) -> None:
+        """Останавливает задачи, прерывая выполняющиеся."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
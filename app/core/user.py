@@ -1,17 +1,27 @@
 # app/core/user.py
-from typing import Optional, Union
+import hashlib
+import time
+from typing import Any, Dict, Optional, Union
 
+import jwt
 from fastapi import Depends, Request
 from fastapi_users import (
-    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException
+    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException,
+    exceptions
 )
 from fastapi_users.authentication import (
     AuthenticationBackend, BearerTransport, JWTStrategy
 )
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import user_token_cache
 from app.core.config import settings
+from app.core.password import password_helper
 from app.core.db import get_async_session
 from app.models.user import User
 from app.schemas.user import UserCreate
@@ -32,12 +42,94 @@ async def get_user_db(session: AsyncSession = Depends(get_async_session)):
 # Указываем URL эндпоинта для получения токена.
 bearer_transport = BearerTransport(tokenUrl='auth/jwt/login')
 
+# Данные пользователя, которые записываются в токен и по которым
+# пользователь восстанавливается без запроса к базе.
+USER_CLAIMS = ('email', 'is_active', 'is_superuser', 'is_verified')
+
+
+def build_user(values: Dict[str, Any]) -> User:
+    """
+    Создаёт объект пользователя из сохранённых значений столбцов.
+
+    Объект помечается как уже существующий в базе, но не привязанный
+    к сессии: его можно добавить в сессию и изменить, как загруженный.
+    Столбцы, которых нет в values (например, hashed_password),
+    загрузятся из базы при первом обращении после добавления в сессию.
+    Каждый запрос получает собственный объект.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+class CachedJWTStrategy(JWTStrategy):
+    """
+    JWT-стратегия, которая не читает пользователя из базы на каждом запросе.
+
+    Пользователь, найденный по токену, хранится в кэше user_token_cache
+    по хешу токена — не дольше, чем действует сам токен; хеш пароля
+    в кэш не попадает. При изменении или удалении пользователя его
+    записи удаляются из кэша (см. UserManager._update). Кэш свой
+    у каждого процесса, поэтому в других воркерах изменение видно
+    не позже чем через user_token_cache_ttl секунд.
+
+    При jwt_trust_claims=True пользователь восстанавливается из данных,
+    записанных в токен при входе, и база не используется совсем.
+    """
+
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+        key = hashlib.sha256(token.encode()).hexdigest()
+        values = user_token_cache.get(key)
+        if values is not None:
+            return build_user(values)
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience,
+                algorithms=[self.algorithm],
+            )
+        except jwt.PyJWTError:
+            return None
+        if settings.jwt_trust_claims and 'email' in data:
+            values = {'id': int(data['sub'])}
+            values.update((claim, data[claim]) for claim in USER_CLAIMS)
+        else:
+            user = await super().read_token(token, user_manager)
+            if user is None:
+                return None
+            values = {
+                attr.key: getattr(user, attr.key)
+                for attr in inspect(User).column_attrs
+                if attr.key != 'hashed_password'
+            }
+        ttl = settings.user_token_cache_ttl
+        if 'exp' in data:
+            ttl = min(ttl, data['exp'] - time.time())
+        if ttl > 0:
+            user_token_cache.set(key, values, ttl=ttl)
+        return build_user(values)
+
+    async def write_token(self, user: User) -> str:
+        data = {'sub': str(user.id), 'aud': self.token_audience}
+        data.update((claim, getattr(user, claim)) for claim in USER_CLAIMS)
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds,
+            algorithm=self.algorithm,
+        )
+
+
+def evict_user_tokens(user_id: int) -> None:
+    """Удаляет из кэша все токены пользователя."""
+    user_token_cache.pop_where(lambda values: values['id'] == user_id)
+
+
 # Определяем стратегию: хранение токена в виде JWT.
 def get_jwt_strategy() -> JWTStrategy:
     # В специальный класс из настроек приложения
     # передаётся секретное слово, используемое для генерации токена.
     # Вторым аргументом передаём срок действия токена в секундах.
-    return JWTStrategy(secret=settings.secret, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=settings.secret, lifetime_seconds=3600)
 
 # Создаём объект бэкенда аутентификации с выбранными параметрами.
 auth_backend = AuthenticationBackend(
@@ -48,6 +140,77 @@ auth_backend = AuthenticationBackend(
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    """
+    Методы create, authenticate и _update повторяют методы библиотеки,
+    но хешируют пароль через await в пуле потоков (app/core/password.py),
+    не занимая event loop.
+    """
+
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop('password')
+        user_dict['hashed_password'] = (
+            await self.password_helper.hash_async(password)
+        )
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хешируем пароль и для несуществующего пользователя, чтобы
+            # по времени ответа нельзя было узнать, есть ли такой email.
+            await self.password_helper.hash_async(credentials.password)
+            return None
+        verified, updated_password_hash = (
+            await self.password_helper.verify_and_update_async(
+                credentials.password, user.hashed_password
+            )
+        )
+        if not verified:
+            return None
+        # Хеш создан с устаревшими параметрами — сохраняем новый.
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {'hashed_password': updated_password_hash}
+            )
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        password = update_dict.get('password')
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {
+                field: value
+                for field, value in update_dict.items()
+                if field != 'password'
+            }
+            update_dict['hashed_password'] = (
+                await self.password_helper.hash_async(password)
+            )
+        updated_user = await super()._update(user, update_dict)
+        # Через _update() проходят и update(), и verify(), и
+        # reset_password(); последние не вызывают on_after_update(),
+        # поэтому токены сбрасываем здесь.
+        evict_user_tokens(user.id)
+        return updated_user
 
     # Здесь можно описать свои условия валидации пароля.
     # При успешной валидации функция ничего не возвращает.
@@ -74,9 +237,16 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
         # Вместо print здесь можно было бы настроить отправку письма.
         print(f'Пользователь {user.email} зарегистрирован.')
 
+    # После удаления пользователя сбрасываем его токены в кэше,
+    # чтобы следующий запрос не нашёл удалённого пользователя.
+    async def on_after_delete(
+            self, user: User, request: Optional[Request] = None
+    ):
+        evict_user_tokens(user.id)
+
 # Корутина, возвращающая объект класса UserManager.
 async def get_user_manager(user_db=Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 # Создаём объект класса FastAPIUsers — это центральный объект библиотеки,
 # связывающий объект класса UserManager и бэкенд аутентификации.
@@ -0,0 +1,41 @@
+"""
+Счётчики версий данных для условных GET-запросов.
+
+CRUD-слой увеличивает счётчик после каждой записи: ROOMS_KEY — при
+изменении списка переговорок, id переговорки — при изменении её
+расписания (бронирований и серий). Эндпоинты строят из счётчика ETag
+и, если клиент прислал тот же ETag в If-None-Match, отвечают 304
+без запроса к базе и без сериализации (см. app/api/conditional.py).
+
+Счётчики живут в памяти процесса и начинаются заново при перезапуске,
+поэтому в ETag входит ещё и случайный идентификатор процесса: ETag,
+выданный прежним процессом, не совпадёт с новым. Как и кэш
+расписаний, счётчики не видят записей других процессов, поэтому
+приложение нужно запускать с одним воркером.
+"""
+import time
+from typing import Hashable
+from uuid import uuid4
+
+# Ключ счётчика списка переговорок; ключи расписаний — id переговорок.
+ROOMS_KEY = 'meeting_rooms'
+
+
+class VersionCounters:
+    """Номер версии и время последнего изменения по ключам."""
+
+    def __init__(self):
+        self.process_id = uuid4().hex[:8]
+        self.started = time.time()
+        self._versions: dict[Hashable, tuple[int, float]] = {}
+
+    def get(self, key: Hashable) -> tuple[int, float]:
+        """Версия и время последнего изменения (Unix-время) ключа."""
+        return self._versions.get(key, (0, self.started))
+
+    def bump(self, key: Hashable) -> None:
+        version, _ = self.get(key)
+        self._versions[key] = (version + 1, time.time())
+
+
+versions = VersionCounters()
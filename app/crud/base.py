@@ -3,9 +3,9 @@
 для CRUD-операций с определёнными моделями.
 А обращаться будем уже не к функциям, а к методам этого класса.
 """
-from typing import Optional
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from collections import defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import insert, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
@@ -15,9 +15,32 @@ class CRUDBase:
     """
     Базовый класс.
     """
+
     def __init__(self, model):
         self.model = model
 
+    def _column_values(self, db_obj) -> dict:
+        """Значения столбцов объекта в виде словаря."""
+        return {
+            key: getattr(db_obj, key)
+            for key in inspect(self.model).column_attrs.keys()
+        }
+
+    async def _before_commit(
+            self,
+            session: AsyncSession,
+            added: Iterable[dict] = (),
+            removed: Iterable[dict] = (),
+    ) -> None:
+        """
+        Вызывается методами записи перед commit().
+
+        added — значения столбцов созданных или изменённых объектов,
+        removed — удалённых объектов или изменённых до изменения.
+        Наследники дописывают здесь связанные данные (например, свёртки)
+        в ту же транзакцию; базовый класс ничего не делает.
+        """
+
     async def get(self, obj_id: int, session: AsyncSession,):
         """Функция для получения объекта по его ID."""
         # Вызываем функцию проверки уникальности поля name:
@@ -27,13 +50,71 @@ class CRUDBase:
         # Извлекаем из него конкретное значение.
         return db_obj.scalars().first()
 
-    async def get_multi(self, session: AsyncSession,):
+    def _get_multi_stmt(
+            self,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+    ):
+        """
+        Запрос на выборку списка объектов с пагинацией по ключу.
+
+        Объекты упорядочены по id, поэтому следующая страница начинается
+        сразу после последнего полученного id — без OFFSET, который
+        заставляет базу пропускать все предыдущие строки.
+        """
+        select_stmt = select(self.model).order_by(self.model.id)
+        if after_id is not None:
+            select_stmt = select_stmt.where(self.model.id > after_id)
+        if limit is not None:
+            select_stmt = select_stmt.limit(limit)
+        return select_stmt
+
+    async def get_multi(self, session: AsyncSession, **kwargs):
         """
         Асинхронная функция, которая будет считывать из базы все переговорки.
+
+        Параметры пагинации и фильтры передаются в _get_multi_stmt().
         """
-        db_objs = await session.execute(select(self.model))
+        db_objs = await session.execute(self._get_multi_stmt(**kwargs))
         return db_objs.scalars().all()
 
+    async def get_multi_rows(
+            self,
+            session: AsyncSession,
+            fields: Iterable[str],
+            **kwargs,
+    ):
+        """
+        Та же выборка, что в get_multi(), но только столбцы fields —
+        строками-кортежами, без создания ORM-объектов.
+        """
+        select_stmt = self._get_multi_stmt(**kwargs).with_only_columns(
+            *(getattr(self.model, field) for field in fields)
+        )
+        connection = await session.connection()
+        db_rows = await connection.execute(select_stmt)
+        return db_rows.all()
+
+    async def stream_multi(
+            self,
+            session: AsyncSession,
+            chunk_size: int = 1000,
+            **kwargs,
+    ):
+        """
+        Асинхронный генератор, отдающий объекты порциями по chunk_size.
+
+        Строки читаются из курсора по мере обработки, поэтому
+        расход памяти не зависит от размера таблицы.
+        """
+        db_objs = await session.stream_scalars(
+            self._get_multi_stmt(**kwargs).execution_options(
+                yield_per=chunk_size
+            )
+        )
+        async for partition in db_objs.partitions():
+            yield partition
+
     async def create(
             self,
             obj_in,
@@ -61,34 +142,82 @@ class CRUDBase:
         # Записываем изменения непосредственно в БД.
         # Так как сессия асинхронная, используем ключевое слово await.
         session.add(db_obj)
+        await self._before_commit(
+            session, added=[self._column_values(db_obj)]
+        )
+        # id приходит из базы в том же INSERT ... RETURNING, а после
+        # commit() объект не устаревает (expire_on_commit=False),
+        # поэтому перечитывать его через refresh() не нужно.
         await session.commit()
-        # Обновляем объект db_room: считываем данные из БД,
-        # чтобы получить его id.
-        await session.refresh(db_obj)
         # Возвращаем только что созданный объект класса MeetingRoom.
         return db_obj
 
+    async def create_multi(
+            self,
+            objs_in,
+            session: AsyncSession,
+            user: Optional[User] = None
+    ) -> list[dict]:
+        """
+        Создаём несколько объектов одним запросом и одним commit().
+
+        Строки вставляются через executemany с RETURNING и возвращаются
+        словарями значений столбцов в порядке objs_in — ORM-объекты
+        не создаются. Порядок строк RETURNING не задаётся: с ним
+        SQLAlchemy выполняла бы для SQLite по одному INSERT на строку.
+        Поэтому строки сопоставляются с objs_in по вставленным значениям;
+        одинаковые входные данные получают разные строки.
+        """
+        objs_in_data = [obj_in.dict() for obj_in in objs_in]
+        if user is not None:
+            for obj_in_data in objs_in_data:
+                obj_in_data['user_id'] = user.id
+        columns = [
+            getattr(self.model, attr.key)
+            for attr in inspect(self.model).column_attrs
+        ]
+        db_rows = await session.execute(
+            insert(self.model).returning(*columns), objs_in_data
+        )
+        keys = list(objs_in_data[0]) if objs_in_data else []
+        db_rows_by_values = defaultdict(list)
+        for db_row in db_rows.mappings():
+            db_rows_by_values[tuple(db_row[key] for key in keys)].append(
+                dict(db_row)
+            )
+        db_rows = [
+            db_rows_by_values[tuple(obj_in_data[key] for key in keys)].pop()
+            for obj_in_data in objs_in_data
+        ]
+        await self._before_commit(session, added=db_rows)
+        await session.commit()
+        return db_rows
+
     async def update(self, db_obj, obj_in, session: AsyncSession,):
         """
         Обновляем.
         """
-        # Представляем объект из БД в виде словаря.
-        obj_data = jsonable_encoder(db_obj)
         # Конвертируем объект с данными из запроса в словарь,
         # исключаем неустановленные пользователем поля.
         update_data = obj_in.dict(exclude_unset=True)
-        # Перебираем все ключи словаря, сформированного из БД-объекта.
-        for field in obj_data:
+        old_values = self._column_values(db_obj)
+        # Перебираем имена столбцов модели: их знает маппер,
+        # сериализовать для этого весь объект не нужно.
+        for field in inspect(self.model).column_attrs.keys():
             # Если конкретное поле есть в словаре с данными из запроса,
             if field in update_data:
                 # то устанавливаем объекту БД новое значение атрибута.
                 setattr(db_obj, field, update_data[field])
         # Добавляем обновленный объект в сессию.
         session.add(db_obj)
-        # Фиксируем изменения.
+        await self._before_commit(
+            session,
+            added=[self._column_values(db_obj)],
+            removed=[old_values],
+        )
+        # Фиксируем изменения. Объект уже содержит новые значения,
+        # поэтому refresh() не нужен.
         await session.commit()
-        # Обновляем объект из БД.
-        await session.refresh(db_obj)
         return db_obj
 
     async def remove(self, db_obj, session: AsyncSession,):
@@ -97,6 +226,9 @@ class CRUDBase:
         """
         # Удаляем объект из БД.
         await session.delete(db_obj)
+        await self._before_commit(
+            session, removed=[self._column_values(db_obj)]
+        )
         # Фиксируем изменения в БД.
         await session.commit()
         # Не обновляем объект через метод refresh(),
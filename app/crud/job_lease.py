@@ -0,0 +1,56 @@
+"""
+CRUD-операции аренды фоновых задач.
+
+Аренда берётся одним запросом INSERT ... ON CONFLICT DO UPDATE ... WHERE:
+если строки задачи ещё нет, она создаётся; если есть, владелец и срок
+меняются только тогда, когда прежняя аренда истекла или принадлежит
+тому же владельцу. RETURNING возвращает строку, только если запись
+произошла, поэтому два процесса не могут получить одну аренду
+одновременно, а читать строку заранее не нужно.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.crud.room_daily_usage import UPSERT_INSERTS
+from app.models import JobLease
+
+
+class CRUDJobLease(CRUDBase):
+
+    async def acquire(
+            self,
+            name: str,
+            owner: str,
+            ttl: float,
+            session: AsyncSession,
+    ) -> bool:
+        """Арендует задачу name на ttl секунд; True, если это удалось."""
+        now = datetime.now()
+        connection = await session.connection()
+        insert_stmt = UPSERT_INSERTS[connection.dialect.name](JobLease)
+        acquired = await session.execute(
+            insert_stmt.values(
+                name=name,
+                owner=owner,
+                expires_at=now + timedelta(seconds=ttl),
+            ).on_conflict_do_update(
+                index_elements=['name'],
+                set_={
+                    'owner': insert_stmt.excluded.owner,
+                    'expires_at': insert_stmt.excluded.expires_at,
+                },
+                where=or_(
+                    JobLease.expires_at <= now,
+                    JobLease.owner == owner,
+                ),
+            ).returning(JobLease.id)
+        )
+        acquired = acquired.first() is not None
+        await session.commit()
+        return acquired
+
+
+job_lease_crud = CRUDJobLease(JobLease)
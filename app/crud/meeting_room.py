@@ -7,13 +7,16 @@
 Чтобы передать полученные в запросе данные из
 Pydantic-схемы в ORM-модель — потребуется конвертировать схему в словарь.
 """
-from typing import Optional
+from typing import Iterable, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import room_reservations_cache
+from app.core.versions import ROOMS_KEY, versions
 from app.crud.base import CRUDBase
 from app.models.meeting_room import MeetingRoom
+from app.models.user import User
 
 
 # Создаем новый класс, унаследованный от CRUDBase.
@@ -47,6 +50,64 @@ class CRUDMeetingRoom(CRUDBase):
         db_room_id = db_room_id.scalars().first()
         return db_room_id
 
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user: Optional[User] = None
+    ):
+        db_obj = await super().create(obj_in, session, user)
+        versions.bump(ROOMS_KEY)
+        return db_obj
+
+    async def update(self, db_obj, obj_in, session: AsyncSession):
+        db_obj = await super().update(db_obj, obj_in, session)
+        versions.bump(ROOMS_KEY)
+        return db_obj
+
+    async def remove(self, db_obj, session: AsyncSession):
+        """
+        Вместе с переговоркой удаляются её бронирования, поэтому
+        сбрасываем и её расписание в кэше: id может быть использован
+        повторно.
+        """
+        room_id = db_obj.id
+        db_obj = await super().remove(db_obj, session)
+        room_reservations_cache.pop(room_id)
+        versions.bump(room_id)
+        versions.bump(ROOMS_KEY)
+        return db_obj
+
+    async def get_existing_ids(
+            self,
+            room_ids: Iterable[int],
+            session: AsyncSession,
+    ) -> set[int]:
+        """Возвращает те id из переданных, для которых есть переговорка."""
+        db_room_ids = await session.execute(
+            select(MeetingRoom.id).where(MeetingRoom.id.in_(set(room_ids)))
+        )
+        return set(db_room_ids.scalars().all())
+
+    async def get_by_min_capacity(
+            self,
+            min_capacity: Optional[int],
+            session: AsyncSession,
+    ):
+        """
+        Возвращает (id, name, capacity) переговорок вместимостью не меньше
+        min_capacity; если она не задана — всех переговорок.
+        """
+        select_stmt = select(
+            MeetingRoom.id, MeetingRoom.name, MeetingRoom.capacity
+        ).order_by(MeetingRoom.id)
+        if min_capacity is not None:
+            select_stmt = select_stmt.where(
+                MeetingRoom.capacity >= min_capacity
+            )
+        db_rooms = await session.execute(select_stmt)
+        return db_rooms.all()
+
 
 # Объект crud наследуем уже не от CRUDBase,
 # а от только что созданного класса CRUDMeetingRoom.
@@ -6,16 +6,58 @@
 добавляем в него нужный метод — и создаём объект уже
 на основе этого нового класса.
 """
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
 
-from typing import Optional
-from sqlalchemy import and_, select
+from typing import Iterable, Optional
+from sqlalchemy import (
+    BigInteger, and_, delete, exists, func, insert, select, union_all
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
+from app.core.cache import room_reservations_cache
+from app.core.config import settings
+from app.core.events import room_events
+from app.core.interval_index import reservation_index
+from app.core.occupancy import to_epoch
+from app.core.versions import versions
 from app.crud.base import CRUDBase
+from app.crud.reservation_series import reservation_series_crud
+from app.crud.room_daily_usage import room_daily_usage_crud
 from app.models.reservation import Reservation
+from app.models.reservation_archive import ReservationArchive
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
+
+class epoch(FunctionElement):
+    """
+    Время в секундах Unix-времени, вычисленное базой.
+
+    Строки с целыми числами читаются намного быстрее, чем с datetime:
+    драйверу и SQLAlchemy не нужно разбирать дату в каждой строке.
+    """
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(epoch)
+def compile_epoch(element, compiler, **kwargs):
+    return 'CAST(EXTRACT(EPOCH FROM %s) AS BIGINT)' % compiler.process(
+        element.clauses, **kwargs
+    )
+
+
+@compiles(epoch, 'sqlite')
+def compile_epoch_sqlite(element, compiler, **kwargs):
+    return "CAST(strftime('%%s', %s) AS INTEGER)" % compiler.process(
+        element.clauses, **kwargs
+    )
+
 
 class CRUDReservation(CRUDBase):
     """
@@ -25,6 +67,33 @@ class CRUDReservation(CRUDBase):
     если это время полностью или частично зарезервировано в каких-то
     объектах бронирования — метод возвращает список этих объектов.
     """
+    @staticmethod
+    def _intersections_clause(
+            *,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            meetingroom_id: int,
+            reservation_id: Optional[int] = None,
+    ):
+        """
+        Условие пересечения интервалов для одной переговорки.
+
+        Сначала идёт равенство по meetingroom_id, затем диапазон по
+        from_reserve — в таком порядке условие ложится на составной индекс
+        (meetingroom_id, from_reserve, to_reserve).
+        """
+        clause = and_(
+            Reservation.meetingroom_id == meetingroom_id,
+            Reservation.from_reserve <= to_reserve,
+            Reservation.to_reserve >= from_reserve,
+        )
+        # Если передан id бронирования...
+        if reservation_id is not None:
+            # ... то к выражению нужно добавить новое условие:
+            # id искомых объектов не равны id обновляемого объекта.
+            clause = and_(clause, Reservation.id != reservation_id)
+        return clause
+
     async def get_reservations_at_the_same_time(
             self,
             # Добавляем звёздочку, чтобы обозначить, что все дальнейшие параметры
@@ -47,59 +116,532 @@ class CRUDReservation(CRUDBase):
         интервалами, при этом надо исключить из проверки сам
         модифицируемый объект модели. Для этого в запрос к базе
         нужно передать id объекта бронирования.
+        В список попадают и пересекающиеся вхождения повторяющихся серий.
         """
-        # Выносим уже существующий запрос в отдельное выражение.
         select_stmt = select(Reservation).where(
-            Reservation.meetingroom_id == meetingroom_id,
-            and_(
-                from_reserve <= Reservation.to_reserve,
-                to_reserve >= Reservation.from_reserve
+            self._intersections_clause(
+                from_reserve=from_reserve,
+                to_reserve=to_reserve,
+                meetingroom_id=meetingroom_id,
+                reservation_id=reservation_id,
             )
         )
-        # Если передан id бронирования...
-        if reservation_id is not None:
-            # ... то к выражению нужно добавить новое условие.
-            select_stmt = select_stmt.where(
-                # id искомых объектов не равны id обновляемого объекта.
-                Reservation.id != reservation_id
-            )
         # Выполняем запрос.
         reservations = await session.execute(select_stmt)
         reservations = reservations.scalars().all()
-        return reservations
+        # Добавляем пересекающиеся вхождения повторяющихся серий.
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=[meetingroom_id],
+            from_time=from_reserve,
+            to_time=to_reserve,
+            session=session,
+        )
+        return [*reservations, *occurrences]
+
+    async def get_conflicts_summary(
+            self,
+            *,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            meetingroom_id: int,
+            reservation_id: Optional[int] = None,
+            limit: int,
+            session: AsyncSession,
+    ) -> tuple[int, list[tuple[datetime, datetime]]]:
+        """
+        Число пересекающихся бронирований и первые limit из них
+        в виде пар (from_reserve, to_reserve), отсортированных по началу.
+
+        Выбираются только столбцы интервала, а общее число считается
+        оконной функцией COUNT(*) OVER () в том же запросе: объекты
+        бронирований не загружаются, сколько бы их ни было.
+        """
+        rows = await (await session.connection()).execute(
+            select(
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+                func.count().over(),
+            ).where(
+                self._intersections_clause(
+                    from_reserve=from_reserve,
+                    to_reserve=to_reserve,
+                    meetingroom_id=meetingroom_id,
+                    reservation_id=reservation_id,
+                )
+            ).order_by(Reservation.from_reserve).limit(limit)
+        )
+        rows = rows.all()
+        count = rows[0][2] if rows else 0
+        intervals = [(row[0], row[1]) for row in rows]
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=[meetingroom_id],
+            from_time=from_reserve,
+            to_time=to_reserve,
+            session=session,
+        )
+        for occurrence in occurrences:
+            count += 1
+            intervals.append((occurrence.from_reserve, occurrence.to_reserve))
+        intervals.sort()
+        return count, intervals[:limit]
+
+    async def has_reservations_at_the_same_time(
+            self,
+            *,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            meetingroom_id: int,
+            reservation_id: Optional[int] = None,
+            session: AsyncSession,
+    ) -> bool:
+        """
+        Быстрая проверка: есть ли хотя бы одно пересечение.
+
+        Запрос SELECT EXISTS(...) останавливается на первой найденной
+        строке и не загружает объекты бронирования целиком.
+        Если включён индекс в памяти, сначала спрашиваем его об обычных
+        бронированиях; к базе за ними обращаемся, только если индекс
+        не может ответить или включён режим сверки. Вхождения серий
+        в индексе нет: они всегда читаются из базы (до первого
+        пересечения), так что запрос экономится, только когда индекс
+        сразу нашёл пересечение с обычным бронированием.
+        """
+        if await self._has_single_reservations_at_the_same_time(
+            from_reserve=from_reserve,
+            to_reserve=to_reserve,
+            meetingroom_id=meetingroom_id,
+            reservation_id=reservation_id,
+            session=session,
+        ):
+            return True
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=[meetingroom_id],
+            from_time=from_reserve,
+            to_time=to_reserve,
+            session=session,
+        )
+        return next(occurrences, None) is not None
+
+    async def _has_single_reservations_at_the_same_time(
+            self,
+            *,
+            from_reserve: datetime,
+            to_reserve: datetime,
+            meetingroom_id: int,
+            reservation_id: Optional[int] = None,
+            session: AsyncSession,
+    ) -> bool:
+        """Проверка пересечений только с обычными бронированиями."""
+        clause_kwargs = dict(
+            from_reserve=from_reserve,
+            to_reserve=to_reserve,
+            meetingroom_id=meetingroom_id,
+            reservation_id=reservation_id,
+        )
+        index_answer = None
+        if settings.reservation_index_mode != 'off':
+            index_answer = reservation_index.has_conflict(**clause_kwargs)
+            if (index_answer is not None
+                    and settings.reservation_index_mode == 'on'):
+                return index_answer
+        select_stmt = select(
+            exists().where(self._intersections_clause(**clause_kwargs))
+        )
+        sql_answer = bool(await session.scalar(select_stmt))
+        if index_answer is not None and index_answer != sql_answer:
+            reservation_index.mismatches += 1
+            logger.warning(
+                'Индекс бронирований разошёлся с базой: %s, индекс=%s, '
+                'база=%s', clause_kwargs, index_answer, sql_answer
+            )
+        return sql_answer
+
+    async def get_intervals_in_window(
+            self,
+            *,
+            room_ids: Iterable[int],
+            from_time: datetime,
+            to_time: datetime,
+            session: AsyncSession,
+    ) -> list[tuple[int, datetime, datetime]]:
+        """
+        Одним запросом возвращает интервалы бронирований переговорок,
+        пересекающиеся с окном, в виде кортежей
+        (meetingroom_id, from_reserve, to_reserve) — без загрузки объектов.
+        """
+        # Выборка только столбцов не требует ORM: выполняем её через
+        # соединение сессии и не тратим время на загрузку сущностей.
+        connection = await session.connection()
+        rows = await connection.execute(
+            select(
+                Reservation.meetingroom_id,
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+            ).where(
+                Reservation.meetingroom_id.in_(set(room_ids)),
+                Reservation.from_reserve <= to_time,
+                Reservation.to_reserve >= from_time,
+            )
+        )
+        return rows.all()
+
+    async def get_busy_intervals(
+            self,
+            *,
+            room_ids: Iterable[int],
+            from_time: datetime,
+            to_time: datetime,
+            session: AsyncSession,
+    ) -> list[tuple[int, datetime, datetime]]:
+        """
+        Занятые интервалы переговорок в окне: бронирования и вхождения серий
+        в виде кортежей (meetingroom_id, from_reserve, to_reserve).
+        """
+        room_ids = set(room_ids)
+        busy = await self.get_intervals_in_window(
+            room_ids=room_ids,
+            from_time=from_time,
+            to_time=to_time,
+            session=session,
+        )
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=room_ids,
+            from_time=from_time,
+            to_time=to_time,
+            session=session,
+        )
+        busy.extend(
+            (occurrence.meetingroom_id, occurrence.from_reserve,
+             occurrence.to_reserve)
+            for occurrence in occurrences
+        )
+        return busy
+
+    async def get_epoch_intervals(
+            self,
+            *,
+            room_ids: Iterable[int],
+            from_time: datetime,
+            to_time: datetime,
+            session: AsyncSession,
+    ) -> list[tuple[int, int, int]]:
+        """
+        Бронирования всех переговорок (включая архивные) и вхождения
+        серий переговорок room_ids, пересекающиеся с окном, в виде
+        кортежей (meetingroom_id, начало, конец), где время — секунды
+        Unix-времени. Бронирования читаются одним запросом только
+        по нужным столбцам.
+        """
+        connection = await session.connection()
+        rows = await connection.execute(union_all(*(
+            select(
+                model.meetingroom_id,
+                epoch(model.from_reserve),
+                epoch(model.to_reserve),
+            ).where(
+                model.from_reserve < to_time,
+                model.to_reserve > from_time,
+            )
+            for model in (Reservation, ReservationArchive)
+        )))
+        intervals = rows.all()
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=room_ids,
+            from_time=from_time,
+            to_time=to_time,
+            session=session,
+        )
+        intervals.extend(
+            (
+                occurrence.meetingroom_id,
+                to_epoch(occurrence.from_reserve),
+                to_epoch(occurrence.to_reserve),
+            )
+            for occurrence in occurrences
+        )
+        return intervals
+
+    async def warm_up_index(self, session: AsyncSession) -> None:
+        """
+        Заполняет индекс в памяти актуальными бронированиями.
+
+        Прошедшие бронирования не нужны: новое бронирование не может
+        начаться раньше текущего времени.
+        """
+        rows = await session.execute(
+            select(
+                Reservation.id,
+                Reservation.meetingroom_id,
+                Reservation.from_reserve,
+                Reservation.to_reserve,
+            ).where(Reservation.to_reserve > datetime.now())
+        )
+        reservation_index.load(rows.all())
+
+    async def _before_commit(
+            self,
+            session: AsyncSession,
+            added: Iterable[dict] = (),
+            removed: Iterable[dict] = (),
+    ) -> None:
+        """Обновляет суточную свёртку загрузки в транзакции записи."""
+        await room_daily_usage_crud.apply(
+            session,
+            added=[
+                (values['meetingroom_id'], values['from_reserve'],
+                 values['to_reserve'])
+                for values in added
+            ],
+            removed=[
+                (values['meetingroom_id'], values['from_reserve'],
+                 values['to_reserve'])
+                for values in removed
+            ],
+        )
+
+    @staticmethod
+    def _after_commit(
+            added: Iterable[tuple[int, int, datetime, datetime]] = (),
+            removed: Iterable[tuple[int, int]] = (),
+            event: Optional[str] = None,
+    ) -> None:
+        """
+        Синхронизирует состояние в памяти после записи в базу
+        и рассылает событие event подписчикам переговорок.
+
+        added — сохранённые бронирования (id, meetingroom_id, from, to),
+        removed — удалённые или изменённые (id, meetingroom_id).
+        """
+        for obj_id, room_id in removed:
+            room_reservations_cache.pop(room_id)
+            versions.bump(room_id)
+            if settings.reservation_index_mode != 'off':
+                reservation_index.remove(obj_id, room_id)
+            if event == 'deleted':
+                room_events.publish(
+                    room_id, event, {'id': obj_id, 'meetingroom_id': room_id}
+                )
+        for obj_id, room_id, from_reserve, to_reserve in added:
+            room_reservations_cache.pop(room_id)
+            versions.bump(room_id)
+            if settings.reservation_index_mode != 'off':
+                reservation_index.add(
+                    obj_id, room_id, from_reserve, to_reserve
+                )
+            if event is not None:
+                # Те же поля, что в расписании переговорки.
+                room_events.publish(room_id, event, {
+                    'from_reserve': from_reserve,
+                    'to_reserve': to_reserve,
+                    'id': obj_id,
+                    'meetingroom_id': room_id,
+                    'series_id': None,
+                })
+
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user: Optional[User] = None
+    ):
+        db_obj = await super().create(obj_in, session, user)
+        self._after_commit(added=[(
+            db_obj.id, db_obj.meetingroom_id,
+            db_obj.from_reserve, db_obj.to_reserve,
+        )], event='created')
+        return db_obj
+
+    async def create_multi(
+            self,
+            objs_in,
+            session: AsyncSession,
+            user: Optional[User] = None
+    ) -> list[dict]:
+        db_rows = await super().create_multi(objs_in, session, user)
+        self._after_commit(added=[
+            (
+                db_row['id'], db_row['meetingroom_id'],
+                db_row['from_reserve'], db_row['to_reserve'],
+            )
+            for db_row in db_rows
+        ], event='created')
+        return db_rows
+
+    async def update(self, db_obj, obj_in, session: AsyncSession):
+        db_obj = await super().update(db_obj, obj_in, session)
+        self._after_commit(
+            removed=[(db_obj.id, db_obj.meetingroom_id)],
+            added=[(
+                db_obj.id, db_obj.meetingroom_id,
+                db_obj.from_reserve, db_obj.to_reserve,
+            )],
+            event='updated',
+        )
+        return db_obj
+
+    async def remove(self, db_obj, session: AsyncSession):
+        # После commit() удалённый объект отвязан от сессии,
+        # поэтому ключи запоминаем заранее.
+        removed = [(db_obj.id, db_obj.meetingroom_id)]
+        db_obj = await super().remove(db_obj, session)
+        self._after_commit(removed=removed, event='deleted')
+        return db_obj
 
     async def get_future_reservations_for_room(
             self,
             room_id: int,
             session: AsyncSession,
+            until: Optional[datetime] = None,
     ):
         """
         Запрос к БД должен извлекать все объекты Reservation,
         которые связаны с запрошенной переговоркой; время окончания
         бронирования у этих объектов должно быть больше текущего времени.
+
+        К ним добавляются вхождения повторяющихся серий до момента until,
+        а если он не указан — на recurrence_window_days дней вперёд.
         """
-        reservations = await session.execute(
-            select(Reservation).where(
-                Reservation.meetingroom_id == room_id,
-                Reservation.to_reserve > datetime.now()
-            )
+        now = datetime.now()
+        select_stmt = select(Reservation).where(
+            Reservation.meetingroom_id == room_id,
+            Reservation.to_reserve > now
         )
+        if until is not None:
+            select_stmt = select_stmt.where(Reservation.from_reserve <= until)
+        reservations = await session.execute(select_stmt)
         reservations = reservations.scalars().all()
-        return reservations
+        occurrences = await reservation_series_crud.get_occurrences(
+            room_ids=[room_id],
+            from_time=now,
+            to_time=until or now + timedelta(
+                days=settings.recurrence_window_days
+            ),
+            session=session,
+        )
+        return sorted(
+            [*reservations, *occurrences],
+            key=lambda reservation: reservation.from_reserve,
+        )
+
+    def _get_multi_stmt(
+            self,
+            after_id: Optional[int] = None,
+            limit: Optional[int] = None,
+            from_time: Optional[datetime] = None,
+            to_time: Optional[datetime] = None,
+    ):
+        """
+        Добавляем к пагинации фильтр по временному окну:
+        в выборку попадают бронирования, пересекающиеся с окном.
+        """
+        select_stmt = super()._get_multi_stmt(after_id, limit)
+        if from_time is not None:
+            select_stmt = select_stmt.where(
+                Reservation.to_reserve >= from_time
+            )
+        if to_time is not None:
+            select_stmt = select_stmt.where(
+                Reservation.from_reserve <= to_time
+            )
+        return select_stmt
 
     async def get_by_user(
             self,
             user: User,
             session: AsyncSession,
+            include_archived: bool = False,
     ):
-        reservations = await session.execute(
-            select(Reservation).where(
-                Reservation.user_id == user.id,
-            )
+        """
+        Бронирования пользователя; с include_archived к ним добавляются
+        перенесённые в архив (объекты ReservationArchive).
+        """
+        models = (
+            (Reservation, ReservationArchive) if include_archived
+            else (Reservation,)
         )
-        reservations = reservations.scalars().all()
+        reservations = []
+        for model in models:
+            db_objs = await session.execute(
+                select(model).where(model.user_id == user.id)
+            )
+            reservations.extend(db_objs.scalars().all())
         return reservations
 
+    async def get_rows_by_user(
+            self,
+            user: User,
+            fields: Iterable[str],
+            session: AsyncSession,
+            include_archived: bool = False,
+    ):
+        """
+        Бронирования пользователя: только столбцы fields, кортежами.
+        С include_archived архив добавляется через UNION ALL в том же
+        запросе.
+        """
+        fields = list(fields)
+        select_stmt = select(
+            *(getattr(Reservation, field) for field in fields)
+        ).where(
+            Reservation.user_id == user.id,
+        )
+        if include_archived:
+            select_stmt = union_all(select_stmt, select(
+                *(getattr(ReservationArchive, field) for field in fields)
+            ).where(
+                ReservationArchive.user_id == user.id,
+            ))
+        connection = await session.connection()
+        rows = await connection.execute(select_stmt)
+        return rows.all()
+
+    async def archive_finished(
+            self,
+            *,
+            before: datetime,
+            session: AsyncSession,
+            batch_size: int,
+    ) -> int:
+        """
+        Переносит бронирования, закончившиеся раньше before, в таблицу
+        reservation_archive и возвращает их число.
+
+        Строки переносятся порциями по batch_size, каждая порция — своя
+        короткая транзакция из двух запросов: DELETE ... RETURNING
+        удаляет порцию и возвращает её строки, INSERT записывает их
+        в архив. Условие на to_reserve проверяется в самом DELETE,
+        поэтому бронирование, которое успели перенести в будущее,
+        в архив не попадёт. Суточная свёртка room_daily_usage при этом
+        не меняется: архивные бронирования остаются в истории загрузки.
+        """
+        columns = [
+            getattr(Reservation, key)
+            for key in ('id', 'from_reserve', 'to_reserve',
+                        'meetingroom_id', 'user_id')
+        ]
+        archived = 0
+        while True:
+            batch = select(Reservation.id).where(
+                Reservation.to_reserve < before
+            ).order_by(Reservation.id).limit(batch_size)
+            connection = await session.connection()
+            rows = await connection.execute(
+                delete(Reservation).where(
+                    Reservation.id.in_(batch.scalar_subquery()),
+                    Reservation.to_reserve < before,
+                ).returning(*columns)
+            )
+            rows = [dict(row) for row in rows.mappings()]
+            if not rows:
+                await session.commit()
+                return archived
+            await connection.execute(insert(ReservationArchive), rows)
+            await session.commit()
+            self._after_commit(removed=[
+                (row['id'], row['meetingroom_id']) for row in rows
+            ])
+            archived += len(rows)
+
 
 # Создаём объекта класса CRUDReservation.
 reservation_crud = CRUDReservation(Reservation)
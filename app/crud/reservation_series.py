@@ -0,0 +1,168 @@
+"""
+CRUD-операции для серий повторяющихся бронирований.
+
+Серия хранится одной строкой, поэтому стоимость запросов растёт с числом
+серий, а не с числом вхождений: из базы выбираются только серии,
+пересекающиеся с окном, а вхождения вычисляются генератором.
+"""
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import room_reservations_cache
+from app.core.events import room_events
+from app.core.recurrence import (
+    ReservationOccurrence, expand_series, get_last_end, get_step
+)
+from app.core.versions import versions
+from app.crud.base import CRUDBase
+from app.crud.room_daily_usage import room_daily_usage_crud
+from app.models.reservation_series import ReservationSeries
+from app.models.user import User
+
+
+class CRUDReservationSeries(CRUDBase):
+
+    async def _before_commit(
+            self,
+            session: AsyncSession,
+            added: Iterable[dict] = (),
+            removed: Iterable[dict] = (),
+    ) -> None:
+        """
+        Обновляет суточную свёртку загрузки всеми вхождениями серий
+        в транзакции записи. Вхождений в серии не больше MAX_OCCURRENCES,
+        поэтому их можно развернуть целиком.
+        """
+        await room_daily_usage_crud.apply(
+            session,
+            added=self._expand_all(added),
+            removed=self._expand_all(removed),
+        )
+
+    def _expand_all(
+            self, values_list: Iterable[dict]
+    ) -> list[tuple[int, datetime, datetime]]:
+        """Все вхождения серий по значениям их столбцов."""
+        return [
+            (
+                occurrence.meetingroom_id,
+                occurrence.from_reserve,
+                occurrence.to_reserve,
+            )
+            for values in values_list
+            for occurrence in expand_series(
+                self.model(**values), values['from_reserve'],
+                values['ends_at'],
+            )
+        ]
+
+    @staticmethod
+    def _after_commit(series_id: int, room_id: int) -> None:
+        """
+        Сбрасывает расписание переговорки в кэше и сообщает подписчикам,
+        что серия изменилась: вхождений может быть сколько угодно,
+        поэтому клиент перечитывает расписание сам.
+        """
+        room_reservations_cache.pop(room_id)
+        versions.bump(room_id)
+        room_events.publish(room_id, 'series_changed', {
+            'series_id': series_id, 'meetingroom_id': room_id,
+        })
+
+    async def create(
+            self,
+            obj_in,
+            session: AsyncSession,
+            user: Optional[User] = None
+    ):
+        """
+        Дополняем данные серии концом последнего вхождения
+        и сохраняем исключения в виде строк ISO 8601 для столбца JSON.
+        """
+        obj_in_data = obj_in.dict()
+        obj_in_data['ends_at'] = get_last_end(
+            obj_in.from_reserve,
+            obj_in.to_reserve,
+            get_step(obj_in.frequency, obj_in.interval),
+            obj_in.count,
+            obj_in.until,
+        )
+        obj_in_data['exceptions'] = [
+            value.isoformat() for value in obj_in.exceptions
+        ]
+        if user is not None:
+            obj_in_data['user_id'] = user.id
+        db_obj = self.model(**obj_in_data)
+        session.add(db_obj)
+        await self._before_commit(
+            session, added=[self._column_values(db_obj)]
+        )
+        await session.commit()
+        self._after_commit(db_obj.id, db_obj.meetingroom_id)
+        return db_obj
+
+    async def update(self, db_obj, obj_in, session: AsyncSession):
+        old_values = self._column_values(db_obj)
+        db_obj.exceptions = [value.isoformat() for value in obj_in.exceptions]
+        session.add(db_obj)
+        await self._before_commit(
+            session,
+            added=[self._column_values(db_obj)],
+            removed=[old_values],
+        )
+        await session.commit()
+        self._after_commit(db_obj.id, db_obj.meetingroom_id)
+        return db_obj
+
+    async def remove(self, db_obj, session: AsyncSession):
+        # После commit() удалённый объект отвязан от сессии,
+        # поэтому ключи запоминаем заранее.
+        series_id, room_id = db_obj.id, db_obj.meetingroom_id
+        db_obj = await super().remove(db_obj, session)
+        self._after_commit(series_id, room_id)
+        return db_obj
+
+    async def get_occurrences(
+            self,
+            *,
+            room_ids: Iterable[int],
+            from_time: datetime,
+            to_time: datetime,
+            session: AsyncSession,
+    ) -> Iterator[ReservationOccurrence]:
+        """
+        Выбирает серии переговорок, пересекающиеся с окном, и возвращает
+        генератор их вхождений в этом окне.
+
+        Вхождения вычисляются по мере чтения генератора: проверке
+        пересечений достаточно первого из них.
+        """
+        select_stmt = select(ReservationSeries).where(
+            ReservationSeries.meetingroom_id.in_(set(room_ids)),
+            ReservationSeries.from_reserve <= to_time,
+            ReservationSeries.ends_at >= from_time,
+        )
+        db_objs = await session.execute(select_stmt)
+        return (
+            occurrence
+            for series in db_objs.scalars().all()
+            for occurrence in expand_series(series, from_time, to_time)
+        )
+
+    async def get_by_user(
+            self,
+            user: User,
+            session: AsyncSession,
+    ):
+        db_objs = await session.execute(
+            select(ReservationSeries).where(
+                ReservationSeries.user_id == user.id,
+            )
+        )
+        return db_objs.scalars().all()
+
+
+reservation_series_crud = CRUDReservationSeries(ReservationSeries)
@@ -0,0 +1,166 @@
+"""
+CRUD-операции суточной свёртки загрузки переговорок.
+
+Свёртка обновляется приращениями: при создании, изменении и удалении
+бронирования или серии повторяющихся бронирований к строкам дней
+прибавляются или вычитаются секунды (у серии — всех её вхождений).
+Приращения пишутся одним запросом INSERT ... ON CONFLICT DO UPDATE,
+поэтому строку дня не нужно предварительно читать, а одновременные
+изменения разных бронирований не теряют друг друга.
+"""
+from collections import Counter
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select, text, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.occupancy import split_by_day
+from app.core.recurrence import expand_series
+from app.crud.base import CRUDBase
+from app.models import (
+    Reservation, ReservationArchive, ReservationSeries, RoomDailyUsage
+)
+
+# INSERT с поддержкой ON CONFLICT для каждой поддерживаемой базы.
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+class CRUDRoomDailyUsage(CRUDBase):
+
+    @staticmethod
+    def _count(
+            intervals: Iterable[tuple[int, datetime, datetime]],
+            sign: int = 1,
+            counter: Optional[Counter] = None,
+    ) -> Counter:
+        """Секунды интервалов по парам (переговорка, день)."""
+        counter = Counter() if counter is None else counter
+        for room_id, from_reserve, to_reserve in intervals:
+            for day, seconds in split_by_day(from_reserve, to_reserve):
+                counter[room_id, day] += sign * seconds
+        return counter
+
+    async def apply(
+            self,
+            session: AsyncSession,
+            added: Iterable[tuple[int, datetime, datetime]] = (),
+            removed: Iterable[tuple[int, datetime, datetime]] = (),
+    ) -> None:
+        """
+        Прибавляет к свёртке интервалы added и вычитает removed
+        (кортежи meetingroom_id, from_reserve, to_reserve).
+
+        Коммит не выполняется: метод вызывается из CRUD-методов
+        бронирований, чтобы свёртка менялась в их транзакции.
+        """
+        deltas = self._count(removed, -1, self._count(added))
+        values = [
+            {'meetingroom_id': room_id, 'day': day, 'booked_seconds': seconds}
+            for (room_id, day), seconds in deltas.items() if seconds
+        ]
+        if not values:
+            return
+        connection = await session.connection()
+        insert_stmt = UPSERT_INSERTS[connection.dialect.name](RoomDailyUsage)
+        await session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=['meetingroom_id', 'day'],
+                set_={
+                    'booked_seconds': (
+                        RoomDailyUsage.booked_seconds
+                        + insert_stmt.excluded.booked_seconds
+                    )
+                },
+            ),
+            values,
+        )
+
+    async def backfill(
+            self,
+            session: AsyncSession,
+            chunk_size: int = 10000,
+    ) -> int:
+        """
+        Пересчитывает свёртку по всем бронированиям, включая архивные,
+        и вхождениям серий и возвращает число строк. Бронирования
+        читаются потоком по chunk_size строк, старая свёртка заменяется
+        новой в одной транзакции.
+
+        Запись в свёртку блокируется до чтения бронирований: иначе
+        приращение бронирования, сохранённого во время пересчёта,
+        пропало бы вместе со старой свёрткой. В PostgreSQL таблица
+        блокируется для записи, чтение её не ждёт; изменения
+        бронирований ждут конца пересчёта и прибавляют свои приращения
+        уже к новой свёртке. В SQLite ту же роль играет блокировка
+        записи, которую берёт первый DELETE: до commit() запись в базу
+        ждёт (не дольше sqlite_busy_timeout).
+        """
+        connection = await session.connection()
+        if connection.dialect.name == 'postgresql':
+            await session.execute(
+                text('LOCK TABLE room_daily_usage IN EXCLUSIVE MODE')
+            )
+        await session.execute(delete(RoomDailyUsage))
+        counter = Counter()
+        rows = await session.stream(
+            union_all(*(
+                select(
+                    model.meetingroom_id,
+                    model.from_reserve,
+                    model.to_reserve,
+                )
+                for model in (Reservation, ReservationArchive)
+            )).execution_options(yield_per=chunk_size)
+        )
+        async for partition in rows.partitions():
+            self._count(partition, counter=counter)
+        series = await session.execute(select(ReservationSeries))
+        for db_obj in series.scalars():
+            self._count(
+                (
+                    (
+                        occurrence.meetingroom_id,
+                        occurrence.from_reserve,
+                        occurrence.to_reserve,
+                    )
+                    for occurrence in expand_series(
+                        db_obj, db_obj.from_reserve, db_obj.ends_at
+                    )
+                ),
+                counter=counter,
+            )
+        values = [
+            {'meetingroom_id': room_id, 'day': day, 'booked_seconds': seconds}
+            for (room_id, day), seconds in counter.items()
+        ]
+        for start in range(0, len(values), chunk_size):
+            await session.execute(
+                insert(RoomDailyUsage), values[start:start + chunk_size]
+            )
+        await session.commit()
+        return len(values)
+
+    async def get_in_window(
+            self,
+            from_day: date,
+            to_day: date,
+            session: AsyncSession,
+    ) -> list[tuple[int, date, int]]:
+        """Строки свёртки (meetingroom_id, day, booked_seconds) за дни окна."""
+        connection = await session.connection()
+        rows = await connection.execute(
+            select(
+                RoomDailyUsage.meetingroom_id,
+                RoomDailyUsage.day,
+                RoomDailyUsage.booked_seconds,
+            ).where(
+                RoomDailyUsage.day >= from_day,
+                RoomDailyUsage.day < to_day,
+            )
+        )
+        return rows.all()
+
+
+room_daily_usage_crud = CRUDRoomDailyUsage(RoomDailyUsage)
@@ -1,18 +1,103 @@
 """Templates for."""
-from fastapi import FastAPI
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 
 # Импортируем главный роутер.
-from api.routers import main_router
+from app.api.routers import main_router
 from app.core.config import settings
+from app.core.db import engine, pool_checkouts
+from app.core.jobs import scheduler
+from app.core.metrics import (
+    RequestTimings, current_timings, metrics, server_timing
+)
+from app.core.query_log import (
+    current_statements, report_repeated_statements
+)
 # Импортируем корутину для создания первого суперюзера.
-from app.core.init_db import create_first_superuser
+from app.core.init_db import (
+    create_first_superuser, warm_up_reservation_index
+)
 
-app = FastAPI(title=settings.app_title, description=settings.description)
+# Ответы по умолчанию сериализуются через orjson: он быстрее json
+# из стандартной библиотеки и сам умеет datetime.
+app = FastAPI(
+    title=settings.app_title,
+    description=settings.description,
+    default_response_class=ORJSONResponse,
+)
 
 # Подключаем главный роутер.
 app.include_router(main_router)
 
 
+if settings.debug_db_checkouts:
+    @app.middleware('http')
+    async def count_db_checkouts(request: Request, call_next):
+        """
+        Считает соединения, взятые из пула за время обработки запроса.
+
+        Соединения, взятые при потоковой отдаче ответа, уже после
+        отправки заголовков, в счётчик не попадают.
+        """
+        counter = [0]
+        token = pool_checkouts.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            pool_checkouts.reset(token)
+        response.headers['X-DB-Checkouts'] = str(counter[0])
+        return response
+
+
+if settings.query_debug:
+    @app.middleware('http')
+    async def detect_repeated_statements(request: Request, call_next):
+        """Собирает SQL-запросы HTTP-запроса и ищет среди них N+1."""
+        statements = Counter()
+        token = current_statements.set(statements)
+        try:
+            return await call_next(request)
+        finally:
+            current_statements.reset(token)
+            report_repeated_statements(
+                request.method, request.url.path, statements
+            )
+
+
+if settings.metrics_enabled:
+    # Шаблоны путей по функциям-обработчикам: в метках метрик должен быть
+    # /reservations/{reservation_id}, а не id каждого бронирования.
+    route_paths = {}
+
+    @app.middleware('http')
+    async def collect_metrics(request: Request, call_next):
+        """
+        Собирает время обработки запроса, SQL-запросов и валидаторов.
+
+        Время SQL-запросов и валидаторов накапливается в RequestTimings
+        через contextvar: задача обработчика создаётся из контекста
+        middleware и видит тот же объект.
+        """
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            response = await call_next(request)
+        finally:
+            current_timings.reset(token)
+        if not route_paths:
+            route_paths.update(
+                (route.endpoint, route.path) for route in app.routes
+            )
+        route = route_paths.get(
+            request.scope.get('endpoint'), '<unmatched>'
+        )
+        elapsed = metrics.observe_request(request.method, route, timings)
+        response.headers['Server-Timing'] = server_timing(timings, elapsed)
+        return response
+
+
 # При старте приложения запускаем корутину create_first_superuser.
 @app.on_event('startup')
 async def startup():
@@ -28,6 +113,21 @@ async def startup():
     в момент остановки приложения: @app.on_event('shutdown').
     """
     await create_first_superuser()
+    await warm_up_reservation_index()
+    # Фоновые задачи обслуживания (app/core/jobs.py).
+    if settings.scheduler_enabled:
+        scheduler.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    """
+    Останавливаем фоновые задачи и закрываем соединения из пула:
+    соединение aiosqlite работает в отдельном потоке, и незакрытые
+    соединения не дают процессу завершиться.
+    """
+    await scheduler.stop()
+    await engine.dispose()
 
 # kaonashi
 # =^..^=______/
@@ -15,6 +15,10 @@ from .reservation import Reservation
 # Чтобы SQLAlchemy узнала обо всех моделях до того, как начнутся выстраиваться
 # взаимосвязи между ними, импортируйте модель User в
 # файл app/models/__init__.py:
+from .job_lease import JobLease
 from .meeting_room import MeetingRoom
 from .reservation import Reservation
+from .reservation_archive import ReservationArchive
+from .reservation_series import ReservationSeries
+from .room_daily_usage import RoomDailyUsage
 from .user import User
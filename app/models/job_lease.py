@@ -0,0 +1,29 @@
+"""Модель аренды фоновых задач."""
+from sqlalchemy import Column, DateTime, String, UniqueConstraint
+
+from app.core.db import Base
+
+
+class JobLease(Base):
+    """
+    Какой процесс и до какого момента выполняет фоновую задачу.
+
+    Строка на задачу: планировщик каждого процесса перед запуском
+    задачи пытается «арендовать» её одним запросом INSERT ... ON CONFLICT
+    DO UPDATE, который меняет владельца, только если прежняя аренда
+    истекла. Так периодическая задача выполняется одним процессом,
+    сколько бы воркеров и серверов ни было запущено.
+    """
+
+    # Имя таблицы задано явно: joblease читается хуже.
+    __tablename__ = 'job_lease'
+
+    name = Column(String(100), nullable=False)
+    owner = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    # Одна строка на задачу; уникальный индекс нужен
+    # для INSERT ... ON CONFLICT.
+    __table_args__ = (
+        UniqueConstraint('name', name='uq_job_lease_name'),
+    )
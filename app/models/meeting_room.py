@@ -1,5 +1,5 @@
 """Описание моделей проекта."""
-from sqlalchemy import Column, String, Text # noqa
+from sqlalchemy import Column, Integer, String, Text # noqa
 # атрибут relationship, описывающий взаимосвязи между моделями,
 # по которому можно будет получить все объекты бронирования
 # для данной переговорки
@@ -17,7 +17,14 @@ class MeetingRoom(Base):
 
     name = Column(String(100), unique=True, nullable=False)
     description = Column(Text)
+    # Вместимость переговорки, человек.
+    capacity = Column(Integer)
     # Установите связь между моделями через функцию relationship.
     reservations = relationship('Reservation', cascade='delete')
+    reservation_series = relationship('ReservationSeries', cascade='delete')
+    daily_usage = relationship('RoomDailyUsage', cascade='delete')
+    archived_reservations = relationship(
+        'ReservationArchive', cascade='delete'
+    )
     # Теперь при удалении объекта переговорки SQLAlchemy удалит
     # все объекты бронирования, связанные с этой переговоркой.
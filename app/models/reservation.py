@@ -1,5 +1,5 @@
 """Модели для бронирования переговорок, дата и время, номер комнаты."""
-from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
 
 from app.core.db import Base
 
@@ -12,7 +12,21 @@ class Reservation(Base):
     meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
     # Каскадное удаление объектов бронирования при удалении связанного с ними
     # пользователя не требуется: удаление пользователей мы отключили.
-    user_id = Column(Integer, ForeignKey('user.id'))
+    # Индекс нужен для выборки бронирований пользователя.
+    user_id = Column(Integer, ForeignKey('user.id'), index=True)
+
+    # Составной индекс под проверку пересечений: сначала равенство
+    # по переговорке, затем диапазон по началу бронирования.
+    # AUTOINCREMENT в SQLite не даёт повторно выдать id удалённой строки:
+    # бронирования переезжают в reservation_archive со своими id,
+    # и новое бронирование не должно получить id архивного.
+    __table_args__ = (
+        Index(
+            'ix_reservation_meetingroom_id_from_reserve_to_reserve',
+            'meetingroom_id', 'from_reserve', 'to_reserve',
+        ),
+        {'sqlite_autoincrement': True},
+    )
 
     def __repr__(self):
         return (
@@ -0,0 +1,31 @@
+"""Модель архива прошедших бронирований."""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.core.db import Base
+
+
+class ReservationArchive(Base):
+    """
+    Бронирование, закончившееся раньше окна хранения.
+
+    Столбцы и id совпадают с Reservation: архивирование переносит
+    строки без изменений (см. python -m app.core.archive), и таблица
+    reservation, по которой идут проверки пересечений и расписания,
+    остаётся небольшой. id не пересекаются с рабочей таблицей:
+    reservation не выдаёт id повторно (AUTOINCREMENT в SQLite).
+    """
+
+    # Имя таблицы задано явно: reservationarchive читается хуже.
+    __tablename__ = 'reservation_archive'
+
+    from_reserve = Column(DateTime)
+    to_reserve = Column(DateTime)
+    meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
+    user_id = Column(Integer, ForeignKey('user.id'), index=True)
+
+    __table_args__ = (
+        Index(
+            'ix_reservation_archive_meetingroom_id_from_reserve',
+            'meetingroom_id', 'from_reserve',
+        ),
+    )
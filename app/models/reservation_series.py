@@ -0,0 +1,37 @@
+"""Модель серии повторяющихся бронирований."""
+from sqlalchemy import (
+    JSON, Column, DateTime, ForeignKey, Index, Integer, String
+)
+
+from app.core.db import Base
+
+
+class ReservationSeries(Base):
+    """
+    Серия бронирований: первое вхождение и правило повторения.
+
+    Вхождения серии в базе не хранятся, их вычисляет генератор
+    из app/core/recurrence.py только для нужного временного окна.
+    """
+    # Первое вхождение серии.
+    from_reserve = Column(DateTime, nullable=False)
+    to_reserve = Column(DateTime, nullable=False)
+    # Частота (daily или weekly) и шаг: каждые interval дней или недель.
+    frequency = Column(String(10), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    # Серия ограничена либо числом вхождений, либо датой.
+    count = Column(Integer)
+    until = Column(DateTime)
+    # Конец последнего вхождения: позволяет отбирать серии по окну в SQL.
+    ends_at = Column(DateTime, nullable=False)
+    # Начала отменённых вхождений в формате ISO 8601.
+    exceptions = Column(JSON, nullable=False, default=list)
+    meetingroom_id = Column(Integer, ForeignKey('meetingroom.id'))
+    user_id = Column(Integer, ForeignKey('user.id'), index=True)
+
+    __table_args__ = (
+        Index(
+            'ix_reservationseries_meetingroom_id_from_reserve_ends_at',
+            'meetingroom_id', 'from_reserve', 'ends_at',
+        ),
+    )
@@ -0,0 +1,34 @@
+"""Модель суточной загрузки переговорок."""
+from sqlalchemy import Column, Date, ForeignKey, Integer, UniqueConstraint
+
+from app.core.db import Base
+
+
+class RoomDailyUsage(Base):
+    """
+    Сколько секунд переговорка забронирована в течение суток.
+
+    Это свёртка таблицы reservation, которую CRUD-слой обновляет
+    в той же транзакции, что и сами бронирования: отчётам по дням
+    и неделям не нужно перечитывать всю историю бронирований.
+    Вхождения повторяющихся серий в свёртку не входят. Пересчитать
+    таблицу целиком можно командой python -m app.core.backfill.
+    """
+
+    # Имя таблицы задано явно: так она называется в отчётах.
+    __tablename__ = 'room_daily_usage'
+
+    meetingroom_id = Column(
+        Integer, ForeignKey('meetingroom.id'), nullable=False
+    )
+    day = Column(Date, nullable=False)
+    booked_seconds = Column(Integer, nullable=False, default=0)
+
+    # Одна строка на переговорку и день; уникальный индекс нужен
+    # для INSERT ... ON CONFLICT и для выборки по переговорке и периоду.
+    __table_args__ = (
+        UniqueConstraint(
+            'meetingroom_id', 'day',
+            name='uq_room_daily_usage_meetingroom_id_day',
+        ),
+    )
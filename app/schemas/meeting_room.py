@@ -1,5 +1,6 @@
 """Pydantic схемы для переговорки, для Post and Get запросов."""
-from typing import Optional
+from datetime import datetime
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field, validator
 
@@ -9,6 +10,7 @@ class MeetingRoomBase(BaseModel):
 
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str]
+    capacity: Optional[int] = Field(None, ge=1)
 
 
 class MeetingRoomCreate(MeetingRoomBase):
@@ -50,3 +52,58 @@ class MeetingRoomDB(MeetingRoomCreate):
         """
 
         orm_mode = True
+
+
+class TimeSlot(BaseModel):
+    """Свободный промежуток между бронированиями."""
+
+    from_reserve: datetime
+    to_reserve: datetime
+
+
+class MeetingRoomAvailability(BaseModel):
+    """Переговорка и её свободные промежутки в запрошенном окне."""
+
+    id: int
+    name: str
+    capacity: Optional[int]
+    free_slots: list[TimeSlot]
+
+
+class RoomPeriodUsage(BaseModel):
+    """Загрузка переговорки за день или неделю."""
+
+    start: datetime
+    booked_hours: float
+    utilization: float
+
+
+class RoomUsage(BaseModel):
+    """Загрузка переговорки за всё окно и по отрезкам."""
+
+    id: int
+    name: str
+    booked_hours: float
+    utilization: float
+    periods: list[RoomPeriodUsage]
+
+
+class RoomUsageStats(BaseModel):
+    """Загрузка переговорок в окне по дням или неделям."""
+
+    from_time: datetime
+    to_time: datetime
+    granularity: Literal['day', 'week']
+    available_hours: float
+    rooms: list[RoomUsage]
+
+
+class OccupancyStats(RoomUsageStats):
+    """
+    Статистика загрузки переговорок с тепловой картой.
+
+    heatmap — доля занятого времени всех переговорок по дням недели
+    (0 — понедельник) и часам; null — такого часа в окне не было.
+    """
+
+    heatmap: list[list[Optional[float]]]
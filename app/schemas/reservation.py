@@ -1,6 +1,6 @@
 """Pydantic схемы для резервирования времени, для Post and Get запросов."""
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Extra, Field, root_validator, validator
 
@@ -89,3 +89,29 @@ class ReservationDB(ReservationBase):
         """
 
         orm_mode = True
+
+
+class RoomReservationDB(ReservationDB):
+    """
+    Бронирование в расписании переговорки.
+
+    Вхождения повторяющихся серий не хранятся в базе и не имеют
+    собственного id — для них заполнено поле series_id.
+    """
+
+    id: Optional[int]
+    series_id: Optional[int]
+
+
+class ReservationBulkResult(BaseModel):
+    """
+    Результат для одного элемента пачки бронирований.
+
+    Поле index — позиция элемента в запросе; для созданных бронирований
+    заполнено поле reservation, для отклонённых — detail с причиной.
+    """
+
+    index: int
+    status: Literal['created', 'conflict', 'room_not_found']
+    reservation: Optional[ReservationDB]
+    detail: Optional[str]
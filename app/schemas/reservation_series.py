@@ -0,0 +1,75 @@
+"""Pydantic схемы для серий повторяющихся бронирований."""
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Extra, Field, root_validator
+
+from app.core.recurrence import MAX_OCCURRENCES, count_occurrences, get_step
+from app.schemas.reservation import ReservationCreate
+
+
+class ReservationSeriesCreate(ReservationCreate):
+    """
+    Схема серии: первое вхождение и правило повторения.
+
+    Серия ограничивается либо числом вхождений count, либо датой until.
+    """
+
+    frequency: Literal['daily', 'weekly']
+    interval: int = Field(1, ge=1)
+    count: Optional[int] = Field(None, ge=1, le=MAX_OCCURRENCES)
+    until: Optional[datetime]
+    # Начала вхождений, которые нужно пропустить.
+    exceptions: list[datetime] = []
+
+    @root_validator(skip_on_failure=True)
+    def check_recurrence_rule(cls, values):
+        """Проверяем, что правило повторения задаёт конечную серию."""
+        if (values['count'] is None) == (values['until'] is None):
+            raise ValueError('Укажите либо count, либо until')
+        step = get_step(values['frequency'], values['interval'])
+        if values['to_reserve'] - values['from_reserve'] >= step:
+            raise ValueError(
+                'Вхождения серии не должны пересекаться друг с другом'
+            )
+        if values['until'] is not None:
+            if values['until'] < values['from_reserve']:
+                raise ValueError(
+                    'Дата окончания серии не может быть раньше её начала'
+                )
+            total = count_occurrences(
+                values['from_reserve'], step, None, values['until']
+            )
+            if total > MAX_OCCURRENCES:
+                raise ValueError(
+                    f'В серии не может быть больше {MAX_OCCURRENCES} '
+                    'вхождений'
+                )
+        return values
+
+
+class ReservationSeriesUpdate(BaseModel):
+    """У существующей серии можно менять только список исключений."""
+
+    exceptions: list[datetime]
+
+    class Config:
+        extra = Extra.forbid
+
+
+class ReservationSeriesDB(BaseModel):
+    """Возвращаем серию после создания."""
+
+    id: int
+    from_reserve: datetime
+    to_reserve: datetime
+    frequency: str
+    interval: int
+    count: Optional[int]
+    until: Optional[datetime]
+    exceptions: list[datetime]
+    meetingroom_id: int
+    user_id: Optional[int]
+
+    class Config:
+        orm_mode = True
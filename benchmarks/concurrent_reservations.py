@@ -0,0 +1,147 @@
+"""
+Нагрузочный тест конкурентных POST /reservations/.
+
+Скрипт создаёт временную SQLite-базу с ROOMS переговорками и отправляет
+REQUESTS запросов на бронирование, не более CONCURRENCY одновременно.
+Интервалы не пересекаются, поэтому каждый запрос проходит проверку
+и заканчивается записью в базу. Выводится пропускная способность,
+задержки и число ответов с ошибкой.
+
+С флагом --baseline скрипт запускается с настройками по умолчанию
+SQLAlchemy и SQLite (без пула, journal_mode=DELETE, synchronous=FULL),
+с флагом --compare — по очереди в обеих конфигурациях.
+
+Запуск из корня проекта:
+    python -m benchmarks.concurrent_reservations
+    python -m benchmarks.concurrent_reservations --compare --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BASELINE_ENV = {
+    'DB_POOL_SIZE': '0',
+    'SQLITE_WAL': 'false',
+    'SQLITE_SYNCHRONOUS': 'FULL',
+    'SQLITE_MMAP_SIZE': '0',
+    'SQLITE_CACHE_SIZE': '-2000',
+    'SQLITE_BUSY_TIMEOUT': '5000',
+}
+EMAIL = 'bench@example.com'
+PASSWORD = 'bench-password'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    return parser.parse_args()
+
+
+async def run(rooms: int, requests: int, concurrency: int) -> None:
+    # Модули приложения читают настройки при импорте,
+    # поэтому импортируем их после настройки окружения.
+    import httpx
+    from sqlalchemy import insert
+
+    from app.core.base import Base
+    from app.core.db import engine
+    from app.main import app
+    from app.models import MeetingRoom
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'id': room_id, 'name': f'room-{room_id}'}
+            for room_id in range(1, rooms + 1)
+        ])
+    for handler in app.router.on_startup:
+        await handler()
+
+    start = datetime.now().replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def reserve(client, headers, number: int) -> None:
+        from_reserve = start + timedelta(hours=number // rooms)
+        body = {
+            'meetingroom_id': number % rooms + 1,
+            'from_reserve': from_reserve.isoformat(),
+            'to_reserve': (from_reserve + timedelta(minutes=50)).isoformat(),
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                '/reservations/', json=body, headers=headers
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = (
+            statuses.get(response.status_code, 0) + 1
+        )
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url='http://bench',
+    ) as client:
+        response = await client.post(
+            '/auth/jwt/login', data={'username': EMAIL, 'password': PASSWORD}
+        )
+        response.raise_for_status()
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            reserve(client, headers, number) for number in range(requests)
+        ))
+        elapsed = time.perf_counter() - started
+    for handler in app.router.on_shutdown:
+        await handler()
+
+    latencies.sort()
+    label = 'baseline' if os.environ.get('DB_POOL_SIZE') == '0' else 'tuned'
+    print(
+        f'{label}: {requests} requests, concurrency {concurrency}: '
+        f'{requests / elapsed:.0f} req/s '
+        f'p50={statistics.median(latencies):.1f}ms '
+        f'p95={latencies[int(len(latencies) * 0.95) - 1]:.1f}ms '
+        f'statuses={dict(sorted(statuses.items()))}'
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    if args.compare:
+        command = [
+            sys.executable, '-m', 'benchmarks.concurrent_reservations',
+            '--rooms', str(args.rooms),
+            '--requests', str(args.requests),
+            '--concurrency', str(args.concurrency),
+        ]
+        subprocess.run(command + ['--baseline'], check=True)
+        subprocess.run(command, check=True)
+        return
+    if args.baseline:
+        os.environ.update(BASELINE_ENV)
+    os.environ['DATABASE_URL'] = (
+        f'sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db'
+    )
+    os.environ['FIRST_SUPERUSER_EMAIL'] = EMAIL
+    os.environ['FIRST_SUPERUSER_PASSWORD'] = PASSWORD
+    asyncio.run(run(args.rooms, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Стресс-тест конкурентных бронирований одних и тех же переговорок.
+
+Скрипт создаёт временную SQLite-базу с ROOMS переговорками и одновременно
+отправляет REQUESTS запросов POST /reservations/ со случайными
+пересекающимися интервалами в пределах одного дня; часть запросов идёт
+через POST /reservations/bulk. Затем все сохранённые бронирования
+проверяются на пересечения. Если найдено хотя бы одно двойное
+бронирование, скрипт завершается с ошибкой.
+
+Запуск из корня проекта:
+    python -m benchmarks.double_booking
+    python -m benchmarks.double_booking --requests 5000 --rooms 3
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+TMP_DIR = tempfile.mkdtemp()
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# и суперпользователя нужно указать до импорта модулей app.
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/bench.db'
+os.environ['FIRST_SUPERUSER_EMAIL'] = 'bench@example.com'
+os.environ['FIRST_SUPERUSER_PASSWORD'] = 'bench-password'
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+START = datetime.now().replace(
+    hour=0, minute=0, second=0, microsecond=0
+) + timedelta(days=1)
+
+
+def random_interval(rng: random.Random, rooms: int) -> dict:
+    from_reserve = START + timedelta(minutes=rng.randrange(0, 24 * 60, 5))
+    return {
+        'meetingroom_id': rng.randint(1, rooms),
+        'from_reserve': from_reserve.isoformat(),
+        'to_reserve': (
+            from_reserve + timedelta(minutes=rng.randrange(15, 120, 5))
+        ).isoformat(),
+    }
+
+
+def find_double_bookings(rows) -> list:
+    """Пары пересекающихся бронирований; границы включаются."""
+    overlaps = []
+    for _, intervals in groupby(sorted(rows), key=itemgetter(0)):
+        latest = None
+        for interval in intervals:
+            if latest is not None and latest[2] >= interval[1]:
+                overlaps.append((latest, interval))
+            if latest is None or interval[2] > latest[2]:
+                latest = interval
+    return overlaps
+
+
+async def run(rooms: int, requests: int, bulk_size: int, seed: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'id': room_id, 'name': f'room-{room_id}'}
+            for room_id in range(1, rooms + 1)
+        ])
+    for handler in app.router.on_startup:
+        await handler()
+    rng = random.Random(seed)
+    statuses = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url='http://bench',
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': os.environ['FIRST_SUPERUSER_EMAIL'],
+            'password': os.environ['FIRST_SUPERUSER_PASSWORD'],
+        })
+        response.raise_for_status()
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+
+        async def reserve(number: int) -> None:
+            # Каждый десятый запрос — пачка бронирований.
+            if bulk_size and number % 10 == 0:
+                response = await client.post(
+                    '/reservations/bulk', headers=headers, json=[
+                        random_interval(rng, rooms) for _ in range(bulk_size)
+                    ],
+                )
+                key = f'bulk {response.status_code}'
+            else:
+                response = await client.post(
+                    '/reservations/', headers=headers,
+                    json=random_interval(rng, rooms),
+                )
+                key = str(response.status_code)
+            statuses[key] = statuses.get(key, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(reserve(number) for number in range(requests)))
+        elapsed = time.perf_counter() - started
+    for handler in app.router.on_shutdown:
+        await handler()
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(
+            Reservation.meetingroom_id,
+            Reservation.from_reserve,
+            Reservation.to_reserve,
+            Reservation.id,
+        ))).all()
+    await engine.dispose()
+    overlaps = find_double_bookings([tuple(row) for row in rows])
+    print(
+        f'{requests} requests to {rooms} rooms in {elapsed:.2f}s: '
+        f'{requests / elapsed:.0f} req/s, statuses '
+        f'{dict(sorted(statuses.items()))}, {len(rows)} reservations saved, '
+        f'{len(overlaps)} double bookings'
+    )
+    for left, right in overlaps[:5]:
+        print(
+            f'  room {left[0]}: #{left[3]} {left[1]:%H:%M}-{left[2]:%H:%M} '
+            f'and #{right[3]} {right[1]:%H:%M}-{right[2]:%H:%M}'
+        )
+    return len(overlaps)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--bulk-size', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    overlaps = asyncio.run(
+        run(args.rooms, args.requests, args.bulk_size, args.seed)
+    )
+    sys.exit(1 if overlaps else 0)
+
+
+if __name__ == '__main__':
+    main()
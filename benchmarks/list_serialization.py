@@ -0,0 +1,167 @@
+"""
+Скорость сериализации больших списков: ORM и pydantic против проекций.
+
+Скрипт создаёт временную SQLite-базу с RESERVATIONS бронированиями
+и сравнивает, сколько строк в секунду отдаёт список бронирований:
+    orm        — загрузка ORM-объектов, ReservationDB.from_orm(),
+                 jsonable_encoder() и JSONResponse, как делает FastAPI
+                 для response_model;
+    projection — выборка только столбцов схемы и orjson
+                 (app/api/projections.py);
+    http       — GET /reservations/ целиком, через приложение;
+    stream     — GET /reservations/?stream=true (NDJSON);
+    schedule   — GET /meeting_rooms/1/reservations с параметром until,
+                 который обходит кэш: все бронирования лежат в одной
+                 переговорке.
+
+Запуск из корня проекта:
+    python -m benchmarks.list_serialization
+    python -m benchmarks.list_serialization --reservations 100000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TMP_DIR = tempfile.mkdtemp()
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# нужно указать до импорта модулей app.
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/bench.db'
+os.environ['FIRST_SUPERUSER_EMAIL'] = 'bench@example.com'
+os.environ['FIRST_SUPERUSER_PASSWORD'] = 'bench-password'
+os.environ.setdefault('PASSWORD_HASH_ROUNDS', '4')
+
+import httpx  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.api.projections import rows_response, schema_fields  # noqa: E402
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+from app.schemas.reservation import ReservationDB  # noqa: E402
+
+START = datetime.now().replace(
+    hour=0, minute=0, second=0, microsecond=0
+) + timedelta(days=1)
+# Все бронирования — в одной переговорке, друг за другом.
+ROOMS = 1
+
+
+async def seed(reservations: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'id': room_id, 'name': f'room-{room_id}'}
+            for room_id in range(1, ROOMS + 1)
+        ])
+        await conn.execute(insert(Reservation), [
+            {
+                'meetingroom_id': number % ROOMS + 1,
+                'from_reserve': START + timedelta(hours=number // ROOMS),
+                'to_reserve': START + timedelta(
+                    hours=number // ROOMS, minutes=30
+                ),
+                'user_id': 1,
+            }
+            for number in range(reservations)
+        ])
+
+
+async def orm_list() -> bytes:
+    async with AsyncSessionLocal() as session:
+        reservations = await reservation_crud.get_multi(session)
+        return JSONResponse(jsonable_encoder([
+            ReservationDB.from_orm(reservation)
+            for reservation in reservations
+        ])).body
+
+
+async def projection_list() -> bytes:
+    fields = schema_fields(ReservationDB)
+    async with AsyncSessionLocal() as session:
+        rows = await reservation_crud.get_multi_rows(session, fields)
+        return rows_response(rows, fields).body
+
+
+async def measure(name: str, func, reservations: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    print(
+        f'{name:<10} {best * 1000:8.1f} ms  '
+        f'{reservations / best:10.0f} rows/s'
+    )
+    return best
+
+
+async def run(reservations: int, repeat: int) -> None:
+    await seed(reservations)
+    for handler in app.router.on_startup:
+        await handler()
+    orm_body, projection_body = await orm_list(), await projection_list()
+    # Ответы должны совпадать с точностью до пробелов между элементами.
+    assert httpx.Response(200, content=orm_body).json() == (
+        httpx.Response(200, content=projection_body).json()
+    )
+
+    print(f'{reservations} reservations, best of {repeat}')
+    orm = await measure('orm', orm_list, reservations, repeat)
+    projection = await measure(
+        'projection', projection_list, reservations, repeat
+    )
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': os.environ['FIRST_SUPERUSER_EMAIL'],
+            'password': os.environ['FIRST_SUPERUSER_PASSWORD'],
+        })
+        response.raise_for_status()
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+
+        async def get(path: str, **params) -> bytes:
+            response = await client.get(path, headers=headers, params=params)
+            response.raise_for_status()
+            return response.content
+
+        await measure(
+            'http', lambda: get('/reservations/'), reservations, repeat
+        )
+        await measure(
+            'stream', lambda: get('/reservations/', stream='true'),
+            reservations, repeat,
+        )
+        await measure(
+            'schedule', lambda: get(
+                '/meeting_rooms/1/reservations',
+                until=(START + timedelta(days=3650)).isoformat(),
+            ),
+            reservations, repeat,
+        )
+    print(f'projection is {orm / projection:.1f}x faster than orm')
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reservations', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.reservations, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Задержка бронирований во время массового входа пользователей.
+
+Скрипт создаёт временную SQLite-базу и последовательно отправляет
+BOOKINGS запросов POST /reservations/ — сначала без фоновой нагрузки,
+затем во время «шторма»: STORM задач непрерывно выполняют вход через
+/auth/jwt/login. Для обеих фаз выводятся p50 и p99 времени
+бронирования и число входов в секунду.
+
+С флагом --inline пароли хешируются в потоке event loop
+(PASSWORD_HASH_WORKERS=0), с флагом --compare скрипт запускается
+по очереди в обоих режимах.
+
+Запуск из корня проекта:
+    python -m benchmarks.login_storm
+    python -m benchmarks.login_storm --compare --storm 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+EMAIL = 'bench@example.com'
+PASSWORD = 'bench-password'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bookings', type=int, default=50)
+    parser.add_argument('--storm', type=int, default=4)
+    parser.add_argument('--inline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    return parser.parse_args()
+
+
+def percentiles(latencies: list) -> str:
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    return f'p50={statistics.median(latencies):.1f}ms p99={p99:.1f}ms'
+
+
+async def run(bookings: int, storm: int) -> None:
+    # Модули приложения читают настройки при импорте,
+    # поэтому импортируем их после настройки окружения.
+    import httpx
+    from sqlalchemy import insert
+
+    from app.core.base import Base
+    from app.core.db import engine
+    from app.main import app
+    from app.models import MeetingRoom
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [{'id': 1, 'name': 'room'}])
+    for handler in app.router.on_startup:
+        await handler()
+    start = datetime.now().replace(
+        minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    credentials = {'username': EMAIL, 'password': PASSWORD}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data=credentials)
+        response.raise_for_status()
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        number = 0
+
+        async def book_series() -> list:
+            nonlocal number
+            latencies = []
+            for _ in range(bookings):
+                from_reserve = start + timedelta(hours=number)
+                number += 1
+                started = time.perf_counter()
+                response = await client.post(
+                    '/reservations/', headers=headers, json={
+                        'meetingroom_id': 1,
+                        'from_reserve': from_reserve.isoformat(),
+                        'to_reserve': (
+                            from_reserve + timedelta(minutes=30)
+                        ).isoformat(),
+                    },
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            return latencies
+
+        quiet = await book_series()
+
+        stop = asyncio.Event()
+        logins = 0
+
+        async def login_loop() -> None:
+            nonlocal logins
+            while not stop.is_set():
+                response = await client.post(
+                    '/auth/jwt/login', data=credentials
+                )
+                response.raise_for_status()
+                logins += 1
+
+        storm_tasks = [
+            asyncio.create_task(login_loop()) for _ in range(storm)
+        ]
+        # Даём шторму разогнаться перед замером.
+        await asyncio.sleep(0.2)
+        started = time.perf_counter()
+        stormy = await book_series()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*storm_tasks)
+    for handler in app.router.on_shutdown:
+        await handler()
+
+    mode = (
+        'inline' if os.environ.get('PASSWORD_HASH_WORKERS') == '0'
+        else 'thread pool'
+    )
+    print(
+        f'{mode}: quiet {percentiles(quiet)}; '
+        f'during {storm} concurrent logins {percentiles(stormy)}, '
+        f'{logins / elapsed:.0f} logins/s'
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    if args.compare:
+        command = [
+            sys.executable, '-m', 'benchmarks.login_storm',
+            '--bookings', str(args.bookings), '--storm', str(args.storm),
+        ]
+        subprocess.run(command + ['--inline'], check=True)
+        subprocess.run(command, check=True)
+        return
+    if args.inline:
+        os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    os.environ['DATABASE_URL'] = (
+        f'sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db'
+    )
+    os.environ['FIRST_SUPERUSER_EMAIL'] = EMAIL
+    os.environ['FIRST_SUPERUSER_PASSWORD'] = PASSWORD
+    asyncio.run(run(args.bookings, args.storm))
+
+
+if __name__ == '__main__':
+    main()
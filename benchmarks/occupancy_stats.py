@@ -0,0 +1,134 @@
+"""
+Время ответа GET /meeting_rooms/stats на большой базе.
+
+Скрипт создаёт временную SQLite-базу с ROOMS переговорками
+и RESERVATIONS бронированиями, разбросанными по году, и замеряет
+статистику загрузки за весь год: отдельно чтение интервалов из базы,
+расчёт агрегатов (с NumPy, если он установлен, и без него) и ответ
+эндпоинта целиком.
+
+Запуск из корня проекта:
+    python -m benchmarks.occupancy_stats
+    python -m benchmarks.occupancy_stats --reservations 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TMP_DIR = tempfile.mkdtemp()
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# нужно указать до импорта модулей app.
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/bench.db'
+os.environ['FIRST_SUPERUSER_EMAIL'] = 'bench@example.com'
+os.environ['FIRST_SUPERUSER_PASSWORD'] = 'bench-password'
+os.environ.setdefault('PASSWORD_HASH_ROUNDS', '4')
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core import occupancy  # noqa: E402
+from app.core.base import Base  # noqa: E402
+from app.core.db import AsyncSessionLocal, engine  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+START = datetime(2030, 1, 1)
+END = START + timedelta(days=365)
+
+
+async def seed(rooms: int, reservations: int) -> None:
+    rng = random.Random(0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {'id': room_id, 'name': f'room-{room_id}'}
+            for room_id in range(1, rooms + 1)
+        ])
+        chunk = 100000
+        for first in range(0, reservations, chunk):
+            rows = []
+            for _ in range(min(chunk, reservations - first)):
+                from_reserve = START + timedelta(
+                    minutes=15 * rng.randrange(365 * 24 * 4)
+                )
+                rows.append({
+                    'meetingroom_id': rng.randint(1, rooms),
+                    'from_reserve': from_reserve,
+                    'to_reserve': from_reserve + timedelta(
+                        minutes=15 * rng.randint(1, 12)
+                    ),
+                })
+            await conn.execute(insert(Reservation), rows)
+
+
+async def run(rooms: int, reservations: int) -> None:
+    started = time.perf_counter()
+    await seed(rooms, reservations)
+    print(
+        f'{rooms} rooms, {reservations} reservations '
+        f'(seeded in {time.perf_counter() - started:.1f} s)'
+    )
+    for handler in app.router.on_startup:
+        await handler()
+
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        intervals = await reservation_crud.get_epoch_intervals(
+            room_ids=range(1, rooms + 1),
+            from_time=START, to_time=END, session=session,
+        )
+        print(f'query      {time.perf_counter() - started:6.2f} s')
+    room_list = [
+        (room_id, f'room-{room_id}') for room_id in range(1, rooms + 1)
+    ]
+    modes = [False] + ([True] if occupancy.numpy is not None else [])
+    for use_numpy in modes:
+        started = time.perf_counter()
+        occupancy.get_occupancy_stats(
+            room_list, intervals, START, END, 'day', use_numpy=use_numpy
+        )
+        print(
+            f'{"numpy" if use_numpy else "python":<10} '
+            f'{time.perf_counter() - started:6.2f} s'
+        )
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench',
+        timeout=None,
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': os.environ['FIRST_SUPERUSER_EMAIL'],
+            'password': os.environ['FIRST_SUPERUSER_PASSWORD'],
+        })
+        response.raise_for_status()
+        started = time.perf_counter()
+        response = await client.get(
+            '/meeting_rooms/stats',
+            params={'from': START.isoformat(), 'to': END.isoformat()},
+            headers={
+                'Authorization': f'Bearer {response.json()["access_token"]}'
+            },
+        )
+        response.raise_for_status()
+        print(f'endpoint   {time.perf_counter() - started:6.2f} s')
+
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--reservations', type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rooms, args.reservations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Замер задержки проверки пересечений бронирований.
+
+Скрипт создаёт временную SQLite-базу, заполняет её N бронированиями
+(по умолчанию 10k, 100k и 1M) и измеряет время запросов
+has_reservations_at_the_same_time() (EXISTS) и
+get_reservations_at_the_same_time() (полная выборка).
+
+Запуск из корня проекта:
+    python -m benchmarks.reservation_overlap
+    python -m benchmarks.reservation_overlap --sizes 10000 100000 --no-index
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# нужно указать до импорта модулей app.
+os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite://')
+
+from sqlalchemy import insert, text  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession, create_async_engine
+)
+
+from app.core.base import Base  # noqa: E402
+from app.crud.reservation import reservation_crud  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+ROOMS = 100
+SLOT = timedelta(minutes=30)
+START = datetime(2024, 1, 1)
+CHUNK = 10_000
+
+
+async def seed(engine, size: int, with_index: bool) -> None:
+    """Создаёт схему и заполняет её бронированиями встык друг к другу."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if not with_index:
+            await conn.execute(text(
+                'DROP INDEX '
+                'ix_reservation_meetingroom_id_from_reserve_to_reserve'
+            ))
+        await conn.execute(insert(MeetingRoom), [
+            {'id': room_id, 'name': f'room-{room_id}'}
+            for room_id in range(1, ROOMS + 1)
+        ])
+        rows = []
+        for number in range(size):
+            room_id = number % ROOMS + 1
+            from_reserve = START + (number // ROOMS) * SLOT
+            rows.append({
+                'meetingroom_id': room_id,
+                'from_reserve': from_reserve,
+                'to_reserve': from_reserve + SLOT - timedelta(seconds=1),
+            })
+            if len(rows) == CHUNK:
+                await conn.execute(insert(Reservation), rows)
+                rows = []
+        if rows:
+            await conn.execute(insert(Reservation), rows)
+
+
+async def measure(session: AsyncSession, method, size: int, repeat: int):
+    """Возвращает задержки одного метода в миллисекундах."""
+    horizon = (size // ROOMS) or 1
+    latencies = []
+    for _ in range(repeat):
+        from_reserve = START + random.randrange(horizon) * SLOT
+        started = time.perf_counter()
+        await method(
+            from_reserve=from_reserve,
+            to_reserve=from_reserve + SLOT,
+            meetingroom_id=random.randint(1, ROOMS),
+            session=session,
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def describe(latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return (
+        f'p50={statistics.median(latencies):.3f}ms '
+        f'p95={p95:.3f}ms max={latencies[-1]:.3f}ms'
+    )
+
+
+async def run(sizes: list[int], repeat: int, with_index: bool) -> None:
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_async_engine(
+                f'sqlite+aiosqlite:///{tmp}/bench.db'
+            )
+            await seed(engine, size, with_index)
+            async with AsyncSession(engine) as session:
+                exists_latency = await measure(
+                    session,
+                    reservation_crud.has_reservations_at_the_same_time,
+                    size, repeat,
+                )
+                select_latency = await measure(
+                    session,
+                    reservation_crud.get_reservations_at_the_same_time,
+                    size, repeat,
+                )
+            await engine.dispose()
+        print(f'{size:>9} reservations, index={with_index}')
+        print(f'    exists: {describe(exists_latency)}')
+        print(f'    select: {describe(select_latency)}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+',
+        default=[10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument(
+        '--no-index', action='store_true',
+        help='удалить составной индекс, чтобы сравнить с полным сканированием'
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat, not args.no_index))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Замер времени ответа GET /meeting_rooms/availability.
+
+Скрипт создаёт временную SQLite-базу с ROOMS переговорками, бронирует
+каждую на несколько часов в каждый день недели и измеряет время ответа
+эндпоинта поиска свободных промежутков на окне в одну неделю.
+
+Запуск из корня проекта:
+    python -m benchmarks.room_availability
+    python -m benchmarks.room_availability --rooms 1000 --per-day 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TMP_DIR = tempfile.mkdtemp()
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# нужно указать до импорта модулей app.
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/bench.db'
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import MeetingRoom, Reservation  # noqa: E402
+
+START = datetime.now().replace(
+    hour=0, minute=0, second=0, microsecond=0
+) + timedelta(days=1)
+
+
+async def seed(rooms: int, per_day: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(MeetingRoom), [
+            {
+                'id': room_id,
+                'name': f'room-{room_id}',
+                'capacity': 4 + room_id % 8,
+            }
+            for room_id in range(1, rooms + 1)
+        ])
+        rows = [
+            {
+                'meetingroom_id': room_id,
+                'from_reserve': START + timedelta(
+                    days=day, hours=8 + slot, minutes=room_id % 30
+                ),
+                'to_reserve': START + timedelta(
+                    days=day, hours=8 + slot, minutes=room_id % 30 + 45
+                ),
+            }
+            for room_id in range(1, rooms + 1)
+            for day in range(7)
+            for slot in range(per_day)
+        ]
+        await conn.execute(insert(Reservation), rows)
+    return len(rows)
+
+
+async def run(rooms: int, per_day: int, repeat: int) -> None:
+    reservations = await seed(rooms, per_day)
+    params = {
+        'from': START.isoformat(),
+        'to': (START + timedelta(days=7)).isoformat(),
+        'duration': 30,
+    }
+    latencies = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench'
+    ) as client:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.get(
+                '/meeting_rooms/availability', params=params
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    await engine.dispose()
+    latencies.sort()
+    print(
+        f'{rooms} rooms, {reservations} reservations, 1 week window: '
+        f'p50={statistics.median(latencies):.1f}ms '
+        f'p95={latencies[int(len(latencies) * 0.95) - 1]:.1f}ms '
+        f'({len(response.json())} rooms with free slots)'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=500)
+    parser.add_argument('--per-day', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.rooms, args.per_day, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
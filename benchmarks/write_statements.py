@@ -0,0 +1,140 @@
+"""
+Число SQL-запросов и время ответа эндпоинтов записи.
+
+Скрипт создаёт временную SQLite-базу, выполняет по REPEAT раз создание
+и изменение переговорки и бронирования через HTTP-запросы и для каждой
+операции выводит среднее число SQL-запросов (по событию
+before_cursor_execute движка) и среднее время ответа. В число запросов
+входят и запросы проверок и аутентификации — так считается полная
+стоимость HTTP-запроса.
+
+Запуск из корня проекта:
+    python -m benchmarks.write_statements
+    python -m benchmarks.write_statements --repeat 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TMP_DIR = tempfile.mkdtemp()
+# Настройки приложения читаются при импорте, поэтому адрес базы
+# и суперпользователя нужно указать до импорта модулей app.
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/bench.db'
+os.environ['FIRST_SUPERUSER_EMAIL'] = 'bench@example.com'
+os.environ['FIRST_SUPERUSER_PASSWORD'] = 'bench-password'
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+START = datetime.now().replace(
+    minute=0, second=0, microsecond=0
+) + timedelta(days=1)
+
+
+class StatementCounter:
+    """Считает SQL-запросы, отправленные через движок."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def measure(results: dict, name: str, counter, request) -> dict:
+    before = counter.count
+    started = time.perf_counter()
+    response = await request
+    elapsed = (time.perf_counter() - started) * 1000
+    response.raise_for_status()
+    total = results.setdefault(name, [0, 0.0, 0])
+    total[0] += counter.count - before
+    total[1] += elapsed
+    total[2] += 1
+    return response.json()
+
+
+async def run(repeat: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    for handler in app.router.on_startup:
+        await handler()
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, 'before_cursor_execute', counter)
+    results = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://bench'
+    ) as client:
+        response = await client.post('/auth/jwt/login', data={
+            'username': os.environ['FIRST_SUPERUSER_EMAIL'],
+            'password': os.environ['FIRST_SUPERUSER_PASSWORD'],
+        })
+        response.raise_for_status()
+        headers = {
+            'Authorization': f'Bearer {response.json()["access_token"]}'
+        }
+        for number in range(repeat):
+            room = await measure(
+                results, 'POST /meeting_rooms/', counter,
+                client.post('/meeting_rooms/', headers=headers, json={
+                    'name': f'room-{number}', 'capacity': 4,
+                }),
+            )
+            await measure(
+                results, 'PATCH /meeting_rooms/{id}', counter,
+                client.patch(
+                    f'/meeting_rooms/{room["id"]}', headers=headers,
+                    json={'description': 'updated'},
+                ),
+            )
+            from_reserve = START + timedelta(hours=number)
+            reservation = await measure(
+                results, 'POST /reservations/', counter,
+                client.post('/reservations/', headers=headers, json={
+                    'meetingroom_id': room['id'],
+                    'from_reserve': from_reserve.isoformat(),
+                    'to_reserve': (
+                        from_reserve + timedelta(minutes=30)
+                    ).isoformat(),
+                }),
+            )
+            await measure(
+                results, 'PATCH /reservations/{id}', counter,
+                client.patch(
+                    f'/reservations/{reservation["id"]}', headers=headers,
+                    json={
+                        'from_reserve': (
+                            from_reserve + timedelta(minutes=10)
+                        ).isoformat(),
+                        'to_reserve': (
+                            from_reserve + timedelta(minutes=40)
+                        ).isoformat(),
+                    },
+                ),
+            )
+    for handler in app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+    for name, (statements, elapsed, calls) in results.items():
+        print(
+            f'{name:28} {statements / calls:5.1f} statements '
+            f'{elapsed / calls:7.2f}ms'
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == '__main__':
+    main()
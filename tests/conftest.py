@@ -0,0 +1,81 @@
+"""
+Общие фикстуры тестов.
+
+Приложение работает в том же процессе на временной SQLite-базе,
+запросы идут через httpx.AsyncClient. Переменные окружения задаются
+до импорта app: настройки читаются один раз при импорте app.core.config.
+"""
+import os
+import tempfile
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite+aiosqlite:///{TMP_DIR}/test.db'
+os.environ['FIRST_SUPERUSER_EMAIL'] = 'admin@example.com'
+os.environ['FIRST_SUPERUSER_PASSWORD'] = 'admin-password'
+# Быстрое хеширование паролей: стойкость в тестах не нужна.
+os.environ['PASSWORD_HASH_ROUNDS'] = '4'
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.base import Base  # noqa: E402
+from app.core.cache import (  # noqa: E402
+    room_reservations_cache, user_token_cache
+)
+from app.core.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+USER_EMAIL = 'user@example.com'
+USER_PASSWORD = 'user-password'
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+async def client():
+    """Клиент приложения на пустой базе с одним суперюзером."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    # id в новой базе начинаются заново: кеши прошлого теста устарели.
+    room_reservations_cache.clear()
+    user_token_cache.clear()
+    await app.router.startup()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        yield client
+    await app.router.shutdown()
+
+
+async def login(client, email, password):
+    response = await client.post(
+        '/auth/jwt/login', data={'username': email, 'password': password}
+    )
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+@pytest.fixture
+async def admin_headers(client):
+    return await login(client, 'admin@example.com', 'admin-password')
+
+
+@pytest.fixture
+async def user_headers(client):
+    await client.post(
+        '/auth/register',
+        json={'email': USER_EMAIL, 'password': USER_PASSWORD},
+    )
+    return await login(client, USER_EMAIL, USER_PASSWORD)
+
+
+@pytest.fixture
+async def room_id(client, admin_headers):
+    response = await client.post(
+        '/meeting_rooms/', json={'name': 'Переговорка'},
+        headers=admin_headers,
+    )
+    return response.json()['id']
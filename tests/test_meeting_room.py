@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
+import pytest
+
+from app.core.versions import ROOMS_KEY, versions
+
+pytestmark = pytest.mark.anyio
+
+
+def day_start():
+    return (datetime.now() + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+async def test_free_slot_interior_can_be_booked(
+        client, user_headers, room_id
+):
+    start = day_start()
+    for hours in ((9, 10), (11, 12)):
+        response = await client.post('/reservations/', json={
+            'from_reserve': (start + timedelta(hours=hours[0])).isoformat(),
+            'to_reserve': (start + timedelta(hours=hours[1])).isoformat(),
+            'meetingroom_id': room_id,
+        }, headers=user_headers)
+        assert response.status_code == 200, response.text
+
+    response = await client.get('/meeting_rooms/availability', params={
+        'from': (start + timedelta(hours=8)).isoformat(),
+        'to': (start + timedelta(hours=13)).isoformat(),
+        'duration': 30,
+    })
+    assert response.status_code == 200, response.text
+    [room] = response.json()
+    assert room['free_slots'] == [
+        {
+            'from_reserve': (start + timedelta(hours=hours[0])).isoformat(),
+            'to_reserve': (start + timedelta(hours=hours[1])).isoformat(),
+        }
+        for hours in ((8, 9), (10, 11), (12, 13))
+    ]
+
+    for slot in room['free_slots']:
+        # Границы включаются: промежуток целиком касается бронирований.
+        response = await client.post(
+            '/reservations/', json={**slot, 'meetingroom_id': room_id},
+            headers=user_headers,
+        )
+        assert response.status_code == 422
+        slot_from = datetime.fromisoformat(slot['from_reserve'])
+        slot_to = datetime.fromisoformat(slot['to_reserve'])
+        response = await client.post('/reservations/', json={
+            'from_reserve': (slot_from + timedelta(minutes=1)).isoformat(),
+            'to_reserve': (slot_to - timedelta(minutes=1)).isoformat(),
+            'meetingroom_id': room_id,
+        }, headers=user_headers)
+        assert response.status_code == 200, response.text
+
+
+async def test_availability_rejects_aware_window(client):
+    start = day_start()
+    response = await client.get('/meeting_rooms/availability', params={
+        'from': start.isoformat() + 'Z',
+        'to': (start + timedelta(hours=1)).isoformat() + 'Z',
+        'duration': 30,
+    })
+    assert response.status_code == 422
+
+
+async def test_stats_rejects_aware_window(client, admin_headers):
+    start = day_start()
+    response = await client.get('/meeting_rooms/stats', params={
+        'from': start.isoformat() + 'Z',
+        'to': (start + timedelta(days=1)).isoformat() + 'Z',
+    }, headers=admin_headers)
+    assert response.status_code == 422
+
+
+async def get_daily_hours(client, admin_headers, path, params):
+    response = await client.get(path, params=params, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    return {
+        room['id']: [period['booked_hours'] for period in room['periods']]
+        for room in response.json()['rooms']
+    }
+
+
+async def test_daily_usage_includes_series(
+        client, admin_headers, user_headers, room_id
+):
+    start = day_start()
+    daily_params = {
+        'from': start.date().isoformat(),
+        'to': (start + timedelta(days=7)).date().isoformat(),
+    }
+    stats_params = {
+        'from': start.isoformat(),
+        'to': (start + timedelta(days=7)).isoformat(),
+    }
+
+    async def check(expected):
+        daily = await get_daily_hours(
+            client, admin_headers, '/meeting_rooms/daily_usage', daily_params
+        )
+        stats = await get_daily_hours(
+            client, admin_headers, '/meeting_rooms/stats', stats_params
+        )
+        assert daily == stats
+        assert daily[room_id] == expected
+
+    response = await client.post('/reservations/series', json={
+        'from_reserve': (start + timedelta(hours=9)).isoformat(),
+        'to_reserve': (start + timedelta(hours=10, minutes=30)).isoformat(),
+        'meetingroom_id': room_id,
+        'frequency': 'daily',
+        'count': 3,
+    }, headers=user_headers)
+    assert response.status_code == 200, response.text
+    series_id = response.json()['id']
+    await check([1.5, 1.5, 1.5, 0, 0, 0, 0])
+
+    response = await client.patch(f'/reservations/series/{series_id}', json={
+        'exceptions': [(start + timedelta(days=1, hours=9)).isoformat()],
+    }, headers=user_headers)
+    assert response.status_code == 200, response.text
+    await check([1.5, 0, 1.5, 0, 0, 0, 0])
+
+    response = await client.delete(
+        f'/reservations/series/{series_id}', headers=user_headers
+    )
+    assert response.status_code == 200, response.text
+    await check([0] * 7)
+
+
+async def test_if_modified_since_within_changed_second(
+        client, admin_headers, room_id
+):
+    _, last_modified = versions.get(ROOMS_KEY)
+    response = await client.get('/meeting_rooms/', headers={
+        **admin_headers,
+        'If-Modified-Since': formatdate(last_modified, usegmt=True),
+    })
+    assert response.status_code == 200
+    response = await client.get('/meeting_rooms/', headers={
+        **admin_headers,
+        'If-Modified-Since': formatdate(last_modified + 1, usegmt=True),
+    })
+    assert response.status_code == 304
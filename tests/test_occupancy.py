@@ -0,0 +1,111 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import occupancy
+
+FROM_TIME = datetime(2026, 3, 5, 7)
+TO_TIME = datetime(2026, 3, 23, 19)
+ROOMS = [(1, 'A'), (2, 'B'), (3, 'C')]
+MINUTE = 60
+
+
+def make_rows(count=300, seed=0):
+    """
+    Бронирования по минутам, в том числе за краями окна и в чужой
+    переговорке (id 4).
+    """
+    rng = random.Random(seed)
+    start = occupancy.to_epoch(FROM_TIME - timedelta(days=1))
+    end = occupancy.to_epoch(TO_TIME + timedelta(days=1))
+    rows = []
+    for _ in range(count):
+        begin = rng.randrange(start, end, MINUTE)
+        rows.append(
+            (rng.randint(1, 4), begin, begin + MINUTE * rng.randint(1, 600))
+        )
+    return rows
+
+
+def brute_force(rows, granularity):
+    """
+    Разбивает бронирования на минуты и складывает их по отрезкам
+    отчёта и по ячейкам тепловой карты.
+    """
+    window_start = occupancy.to_epoch(FROM_TIME)
+    window_end = occupancy.to_epoch(TO_TIME)
+    step, offset = occupancy.PERIODS[granularity]
+    bounds = occupancy.get_boundaries(window_start, window_end, step, offset)
+    booked = {room_id: [0] * (len(bounds) - 1) for room_id, _ in ROOMS}
+    cells = [[0] * 24 for _ in range(7)]
+    for room_id, begin, end in rows:
+        if room_id not in booked:
+            continue
+        for minute in range(
+            max(begin, window_start), min(end, window_end), MINUTE
+        ):
+            period = max(
+                number for number, bound in enumerate(bounds[:-1])
+                if bound <= minute
+            )
+            booked[room_id][period] += MINUTE
+            moment = occupancy.EPOCH + timedelta(seconds=minute)
+            cells[moment.weekday()][moment.hour] += MINUTE
+    return booked, cells
+
+
+@pytest.mark.parametrize('granularity', ['day', 'week'])
+@pytest.mark.parametrize('use_numpy', [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(
+        occupancy.numpy is None, reason='NumPy не установлен'
+    )),
+])
+def test_stats_match_per_minute_split(granularity, use_numpy):
+    rows = make_rows()
+    stats = occupancy.get_occupancy_stats(
+        ROOMS, rows, FROM_TIME, TO_TIME, granularity, use_numpy=use_numpy
+    )
+    booked, cells = brute_force(rows, granularity)
+    for room in stats['rooms']:
+        assert [
+            period['booked_hours'] for period in room['periods']
+        ] == [
+            round(seconds / occupancy.HOUR, 3)
+            for seconds in booked[room['id']]
+        ]
+
+    available = [[0] * 24 for _ in range(7)]
+    moment = FROM_TIME
+    while moment < TO_TIME:
+        available[moment.weekday()][moment.hour] += (
+            occupancy.HOUR * len(ROOMS)
+        )
+        moment += timedelta(hours=1)
+    assert stats['heatmap'] == [
+        [
+            round(seconds / total, 4) if total else None
+            for seconds, total in zip(cell_row, available_row)
+        ]
+        for cell_row, available_row in zip(cells, available)
+    ]
+
+
+@pytest.mark.skipif(occupancy.numpy is None, reason='NumPy не установлен')
+@pytest.mark.parametrize('granularity', ['day', 'week'])
+def test_numpy_and_python_agree(granularity):
+    rows = make_rows(count=2000, seed=1)
+    assert occupancy.get_occupancy_stats(
+        ROOMS, rows, FROM_TIME, TO_TIME, granularity, use_numpy=True
+    ) == occupancy.get_occupancy_stats(
+        ROOMS, rows, FROM_TIME, TO_TIME, granularity, use_numpy=False
+    )
+
+
+@pytest.mark.skipif(occupancy.numpy is not None, reason='NumPy установлен')
+def test_numpy_required_when_requested():
+    with pytest.raises(RuntimeError, match='NumPy'):
+        occupancy.get_occupancy_stats(
+            ROOMS, [], FROM_TIME, TO_TIME, 'day', use_numpy=True
+        )
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bulk_results_follow_input_order(client, user_headers, room_id):
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    items = [
+        {
+            'from_reserve': (start + timedelta(hours=hours)).isoformat(),
+            'to_reserve': (
+                start + timedelta(hours=hours, minutes=30)
+            ).isoformat(),
+            'meetingroom_id': room_id,
+        }
+        for hours in (5, 1, 4, 2, 3)
+    ]
+    response = await client.post(
+        '/reservations/bulk', json=items, headers=user_headers
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [result['status'] for result in results] == ['created'] * 5
+    for item, result in zip(items, results):
+        assert result['reservation']['from_reserve'] == item['from_reserve']
+    assert len({result['reservation']['id'] for result in results}) == 5
+
+    response = await client.get(
+        '/reservations/my_reservations', headers=user_headers
+    )
+    stored = {
+        reservation['id']: reservation['from_reserve']
+        for reservation in response.json()
+    }
+    for item, result in zip(items, results):
+        assert stored[result['reservation']['id']] == item['from_reserve']
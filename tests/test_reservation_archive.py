@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.init_db import get_async_session_context
+from app.crud.reservation import reservation_crud
+
+pytestmark = pytest.mark.anyio
+
+
+async def archive_all():
+    # Переносим в архив всё, включая будущие бронирования.
+    async with get_async_session_context() as session:
+        return await reservation_crud.archive_finished(
+            before=datetime.now() + timedelta(days=30),
+            session=session,
+            batch_size=100,
+        )
+
+
+async def test_archive_after_id_reuse(client, user_headers, room_id):
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    ids = []
+    for _ in range(2):
+        response = await client.post('/reservations/', json={
+            'from_reserve': start.isoformat(),
+            'to_reserve': (start + timedelta(hours=1)).isoformat(),
+            'meetingroom_id': room_id,
+        }, headers=user_headers)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()['id'])
+        # Таблица reservation пуста: без AUTOINCREMENT SQLite выдал бы
+        # следующему бронированию тот же id.
+        assert await archive_all() == 1
+    assert ids[0] != ids[1]
+
+    response = await client.get(
+        '/reservations/my_reservations',
+        params={'include_archived': True}, headers=user_headers,
+    )
+    assert sorted(item['id'] for item in response.json()) == sorted(ids)
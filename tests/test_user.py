@@ -0,0 +1,36 @@
+import pytest
+
+from app.core.cache import user_token_cache
+from conftest import USER_EMAIL, login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_token_cache_does_not_keep_password_hash(client, user_headers):
+    response = await client.get('/users/me', headers=user_headers)
+    assert response.status_code == 200, response.text
+    assert user_token_cache._data
+    for _, values in user_token_cache._data.values():
+        assert 'hashed_password' not in values
+
+
+async def test_password_change_through_cached_user(client, user_headers):
+    await client.get('/users/me', headers=user_headers)
+    response = await client.patch(
+        '/users/me', json={'password': 'new-password'}, headers=user_headers
+    )
+    assert response.status_code == 200, response.text
+    assert await login(client, USER_EMAIL, 'new-password')
+
+
+async def test_deactivated_user_loses_cached_token(
+        client, admin_headers, user_headers
+):
+    response = await client.get('/users/me', headers=user_headers)
+    user_id = response.json()['id']
+    response = await client.patch(
+        f'/users/{user_id}', json={'is_active': False}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    response = await client.get('/users/me', headers=user_headers)
+    assert response.status_code == 401